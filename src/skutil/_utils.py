@@ -0,0 +1,18 @@
+"""Private helpers shared by the subpackages of skutil."""
+
+
+def _n_rows(X):
+    """Return the number of rows of an array-like, without validating it."""
+    return X.shape[0] if hasattr(X, "shape") else len(X)
+
+
+def _rows(X, rows):
+    """Return some rows of an array, sparse matrix, data frame or list.
+
+    rows is a slice or an array of indices.
+    """
+    if hasattr(X, "iloc"):
+        return X.iloc[rows]
+    if hasattr(X, "shape") or isinstance(rows, slice):
+        return X[rows]
+    return [X[i] for i in rows]
@@ -2,10 +2,18 @@ from .calib_clf import (
     CalibratingCvClassifier,
 )
 from .calib_clf_cv import (
+    CalibrationCurveAccumulator,
     UnsafeCalibratedClassifierCV,
 )
+from .calib_io import (
+    dump_calibrated,
+    load_calibrated,
+)
 
 __all__ = [
     "CalibratingCvClassifier",
+    "CalibrationCurveAccumulator",
     "UnsafeCalibratedClassifierCV",
+    "dump_calibrated",
+    "load_calibrated",
 ]
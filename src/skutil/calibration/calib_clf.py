@@ -1,12 +1,37 @@
 """Scikit-learn classifier wrapper calibrating after fit."""
 
+import math
+import numbers
+
+import numpy as np
 from sklearn.base import BaseEstimator, ClassifierMixin
 from sklearn.model_selection import train_test_split
 
 # from sklearn.calibration import CalibratedClassifierCV
+from .._utils import _n_rows
 from .calib_clf_cv import UnsafeCalibratedClassifierCV
 
 
+def _n_val(n_samples, val_size):
+    """Return the validation set size train_test_split takes for val_size."""
+    if val_size is None:
+        val_size = 0.25
+    if isinstance(val_size, numbers.Integral):
+        if not 0 < val_size < n_samples:
+            raise ValueError(
+                "val_size=%d should be between 1 and the number of samples "
+                "minus 1, %d." % (val_size, n_samples - 1)
+            )
+        return int(val_size)
+    if not 0 < val_size < 1:
+        raise ValueError(
+            "val_size=%r should be a float between 0 and 1, or an "
+            "int." % (val_size,)
+        )
+    # train_test_split rounds the test set size up
+    return math.ceil(val_size * n_samples)
+
+
 class CalibratingCvClassifier(BaseEstimator, ClassifierMixin):
     """A sklearn classifier wrapper using part of the train set to calibrate.
 
@@ -24,15 +49,40 @@ class CalibratingCvClassifier(BaseEstimator, ClassifierMixin):
         of items is randomly sampled. By default, set to 0.25.
     stratify : bool, default True
         If set to True, the validation set is sampled in a stratified way.
+    batch_size : int, optional
+        If given, predict_proba scores the input in consecutive chunks of at
+        most this many rows. See UnsafeCalibratedClassifierCV.
+    dtype : {np.float64, np.float32}, default np.float64
+        The floating point type of the predicted probabilities and of the
+        calibration computations. See UnsafeCalibratedClassifierCV.
+    max_calib_samples : int, optional
+        If given, the validation set is capped at this many entries, sampled
+        in the same (stratified, if stratify is True) way, and the entries
+        of the val_size portion left over are used to train clf instead.
+        Calibration seldom needs more than a few tens of thousands of
+        entries, so this keeps the cost of calibrating constant on large
+        train sets. By default, the whole val_size portion is used.
 
     """
 
-    def __init__(self, clf, method=None, val_size=None, stratify=True):
+    def __init__(
+        self,
+        clf,
+        method=None,
+        val_size=None,
+        stratify=True,
+        batch_size=None,
+        dtype=np.float64,
+        max_calib_samples=None,
+    ):
         """Initialize the calibrating classifier."""
         self.clf = clf
         self.method = method
         self.val_size = val_size
         self.stratify = stratify
+        self.batch_size = batch_size
+        self.dtype = dtype
+        self.max_calib_samples = max_calib_samples
 
     def fit(self, X, y):
         """Fits the classifier.
@@ -53,16 +103,55 @@ class CalibratingCvClassifier(BaseEstimator, ClassifierMixin):
         stratify = None
         if self.stratify:
             stratify = y
+        val_size = self.val_size
+        if self.max_calib_samples is not None:
+            if (
+                not isinstance(self.max_calib_samples, numbers.Integral)
+                or self.max_calib_samples < 1
+            ):
+                raise ValueError(
+                    "max_calib_samples should be a positive int, got %r."
+                    % (self.max_calib_samples,)
+                )
+            val_size = min(
+                _n_val(_n_rows(X), val_size), self.max_calib_samples
+            )
         X_train, X_val, y_train, y_val = train_test_split(
-            X, y, test_size=self.val_size, stratify=stratify
+            X, y, test_size=val_size, stratify=stratify
         )
         self.clf.fit(X_train, y_train)
         self._calib = UnsafeCalibratedClassifierCV(
-            base_estimator=self.clf, method=self.method, cv="prefit"
+            base_estimator=self.clf,
+            method=self.method,
+            cv="prefit",
+            batch_size=self.batch_size,
+            dtype=self.dtype,
         )
         self._calib.fit(X_val, y_val)
         return self
 
+    def recalibrate_partial(self, X, y):
+        """Update the calibration with newly labeled data.
+
+        The inner classifier is left untouched, and only the calibration is
+        updated, at a cost proportional to the size of the new batch.
+
+        Parameters
+        ----------
+        X : array-like, shape = [n_samples, n_features]
+            The new input samples.
+        y : array-like, shape = [n_samples]
+            The target values. An array of int.
+
+        Returns
+        -------
+        self : object
+            Returns self.
+
+        """
+        self._calib.recalibrate_partial(X, y)
+        return self
+
     def predict(self, X):
         """Predict labels.
 
@@ -79,13 +168,15 @@ class CalibratingCvClassifier(BaseEstimator, ClassifierMixin):
         """
         return self._calib.predict(X)
 
-    def predict_proba(self, X):
+    def predict_proba(self, X, out=None):
         """Predict class probabilities for X.
 
         Parameters
         ----------
         X : array-like of shape = [n_samples, n_features]
             The input samples.
+        out : array of shape = [n_samples, n_classes], optional
+            A preallocated array to write the class probabilities into.
 
         Returns
         -------
@@ -94,4 +185,4 @@ class CalibratingCvClassifier(BaseEstimator, ClassifierMixin):
             classes corresponds to that in the attribute classes_.
 
         """
-        return self._calib.predict_proba(X)
+        return self._calib.predict_proba(X, out=out)
@@ -9,22 +9,34 @@
 
 from __future__ import division
 
+import numbers
 import warnings
+from collections import namedtuple
 from inspect import signature
-from math import log
+from itertools import repeat
 
 import numpy as np
-from scipy.optimize import fmin_bfgs
+from joblib import Parallel, delayed
+from scipy.optimize import minimize
+from scipy.special import expit
 from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin, clone
 
 # from sklearn.utils.fixes import signature
 from sklearn.isotonic import IsotonicRegression
+from sklearn.metrics import log_loss
 from sklearn.model_selection import check_cv
 from sklearn.preprocessing import LabelBinarizer, LabelEncoder, label_binarize
 from sklearn.svm import LinearSVC
-from sklearn.utils import column_or_1d, indexable
+from sklearn.utils import (
+    check_array,
+    column_or_1d,
+    gen_batches,
+    indexable,
+)
 from sklearn.utils.validation import check_consistent_length, check_is_fitted
 
+from .._utils import _n_rows, _rows
+
 
 class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
     """Probability calibration with isotonic regression or sigmoid.
@@ -46,13 +58,19 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
         to offer more accurate predict_proba outputs. If cv=prefit, the
         classifier must have been fit already on data.
 
-    method : 'sigmoid' or 'isotonic'
+    method : 'sigmoid', 'isotonic', 'temperature' or 'vector'
         The method to use for calibration. Can be 'sigmoid' which
         corresponds to Platt's method or 'isotonic' which is a
         non-parametric approach. It is not advised to use isotonic calibration
         with too few calibration samples ``(<<1000)`` since it tends to
         overfit.
         Use sigmoids (Platt's calibration) in this case.
+        Both fit one calibrator per class and renormalize. 'temperature' and
+        'vector' instead fit a single softmax over the decision scores of
+        all classes, scaled by a single temperature or by a weight and bias
+        per class, respectively [5]; their cost does not grow with the
+        number of classes. If base_estimator has no decision_function, the
+        logarithms of its predicted probabilities are scaled.
 
     cv : integer, cross-validation generator, iterable or "prefit", optional
         Determines the cross-validation splitting strategy.
@@ -74,15 +92,96 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
         If "prefit" is passed, it is assumed that base_estimator has been
         fitted already and all data is used for calibration.
 
+    n_jobs : int or None, optional
+        The number of jobs to use to fit and calibrate the cross-validation
+        folds in parallel. None means 1 unless in a
+        :obj:`joblib.parallel_backend` context, which can also be used to
+        choose between a process-based and a thread-based backend. -1 means
+        using all processors. Ignored if cv="prefit". Fold order in
+        calibrated_classifiers_ does not depend on this parameter.
+
+    ensemble : bool, default True
+        If True, a calibrated classifier is fitted for every fold, and their
+        probabilities are averaged at prediction time. If False, the
+        out-of-fold decision scores of all folds are collected and used to
+        fit a single calibrator, while base_estimator is refitted once on
+        all the data; predicting then costs a single model evaluation.
+        Ignored if cv="prefit".
+
+    batch_size : int or None, optional
+        If given, predict_proba scores the input in consecutive chunks of at
+        most this many rows, so that its temporary memory does not depend on
+        the number of input rows. By default, all rows are scored at once.
+
+    lookup_bins : int or None, optional
+        If given, every fitted calibrator is compiled into a lookup table of
+        this many equal-width bins over the range of its calibration scores,
+        so that calibrating a score costs a single array gather. Scores
+        outside that range get the value of the nearest bin. The maximal
+        error of the compiled sigmoid is about a quarter of its slope times
+        the bin width. By default, calibrators are evaluated exactly. Ignored
+        for the 'temperature' and 'vector' methods.
+
+    weighted_folds : bool, default False
+        If True, the estimators of the cross-validation folds are fitted on
+        all of X, with a sample weight of zero for the rows outside their
+        train fold, so that no fold of X is ever copied. This is only
+        equivalent to the default when base_estimator ignores rows of zero
+        weight, as weighted linear models do, and requires its fit to
+        accept sample_weight. The test folds are scored in chunks of
+        batch_size rows. Together with an X that is an ``np.memmap`` (e.g.
+        from ``np.load(path, mmap_mode="r")``), which joblib passes to its
+        workers by file name rather than by pickling it, fitting never
+        holds a copy of X in memory. Ignored if cv="prefit".
+
+    aggregate : None, 'unique' or int, optional
+        If given, the calibration scores of every class are first collapsed
+        into weighted points, and the sigmoid and isotonic calibrators are
+        fitted on these points rather than on every calibration row. With
+        'unique', rows of equal score (and label, for 'sigmoid') are merged,
+        which leaves the fitted calibrators unchanged up to rounding. With an
+        integer, the scores are split into this many quantile bins, and the
+        rows of a bin (and label) are merged at their mean score; the
+        largest score displacement this causes is then reported by
+        aggregation_error_, and changes a calibrated sigmoid probability by
+        at most a quarter of its slope times that. Platt's targets are
+        computed from the raw class counts in both cases. Ignored for the
+        'temperature' and 'vector' methods and by recalibrate_partial.
+
+    dtype : {np.float64, np.float32}, default np.float64
+        The floating point type of the predicted probabilities and of the
+        computations producing them. With np.float32, the decision scores
+        are cast once as they are extracted, the calibrators are evaluated
+        and the probabilities of the folds are averaged in single
+        precision, halving the memory and bandwidth of predict_proba, and
+        the sigmoid calibrators are fitted in single precision too, to
+        about 1e-4 relative precision. Probabilities then typically differ
+        from those of np.float64 by 1e-7 to 1e-4: rounding errors are of
+        the order of 1e-7, but rounded scores move along steep isotonic
+        steps, probabilities of predict_proba estimators are clipped to
+        [1.2e-7, 1 - 1.2e-7] before the logarithms of the 'temperature'
+        and 'vector' methods, and sigmoid parameters are less accurate.
+        With lookup_bins, a score rounded across a bin edge also gets the
+        value of the neighbouring bin, which is within the error of the
+        table itself. Isotonic, temperature and vector calibrators are
+        still fitted in double precision. Can be changed after fitting.
+
     Attributes
     ----------
     classes_ : array, shape (n_classes)
         The class labels.
 
-    calibrated_classifiers_ : list (len() equal to cv or 1 if cv == "prefit")
+    calibrated_classifiers_ : list (len() equal to cv or 1 if cv == "prefit"
+        or ensemble=False)
         The list of calibrated classifiers, one for each crossvalidation fold,
         which has been fitted on all but the validation fold and calibrated
-        on the validation fold.
+        on the validation fold. If ensemble=False, a single classifier fitted
+        on all the data and calibrated on the out-of-fold scores.
+
+    aggregation_error_ : float
+        The largest distance between a calibration score and the score of
+        the point it was aggregated into, over all calibrators. Zero if
+        aggregate is None or 'unique'.
 
     References
     ----------
@@ -98,13 +197,35 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
     .. [4] Predicting Good Probabilities with Supervised Learning,
            A. Niculescu-Mizil & R. Caruana, ICML 2005
 
+    .. [5] On Calibration of Modern Neural Networks, C. Guo, G. Pleiss,
+           Y. Sun & K. Q. Weinberger, ICML 2017
+
     """
 
-    def __init__(self, base_estimator=None, method="sigmoid", cv=3):
+    def __init__(
+        self,
+        base_estimator=None,
+        method="sigmoid",
+        cv=3,
+        n_jobs=None,
+        ensemble=True,
+        batch_size=None,
+        lookup_bins=None,
+        weighted_folds=False,
+        aggregate=None,
+        dtype=np.float64,
+    ):
         """Initialize the calibrating classifier."""
         self.base_estimator = base_estimator
         self.method = method
         self.cv = cv
+        self.n_jobs = n_jobs
+        self.ensemble = ensemble
+        self.batch_size = batch_size
+        self.lookup_bins = lookup_bins
+        self.weighted_folds = weighted_folds
+        self.aggregate = aggregate
+        self.dtype = dtype
 
     def fit(self, X, y, sample_weight=None):
         """Fit the calibrated model.
@@ -126,6 +247,75 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
             Returns an instance of self.
 
         """
+        X, y, base_estimator, cv, base_estimator_sample_weight = (
+            self._check_fit_args(X, y, sample_weight)
+        )
+        self.calibrated_classifiers_ = []
+
+        if cv is None:
+            calibrated_classifier = self._calibrated_classifier(base_estimator)
+            if sample_weight is not None:
+                calibrated_classifier.fit(X, y, sample_weight)
+            else:
+                calibrated_classifier.fit(X, y)
+            self.calibrated_classifiers_.append(calibrated_classifier)
+        else:
+            if not self.ensemble:
+                self.calibrated_classifiers_ = [
+                    self._fit_out_of_fold(
+                        base_estimator,
+                        X,
+                        y,
+                        cv,
+                        sample_weight,
+                        base_estimator_sample_weight,
+                    )
+                ]
+                return self
+
+            # folds are independent; Parallel returns results in the order
+            # of cv.split, so fold order is preserved for any backend
+            self.calibrated_classifiers_ = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fit_calibrated_fold)(
+                    self._calibrated_classifier(
+                        clone(base_estimator), classes=self.classes_
+                    ),
+                    X,
+                    y,
+                    train,
+                    test,
+                    sample_weight=sample_weight,
+                    base_estimator_sample_weight=base_estimator_sample_weight,
+                    weighted=self.weighted_folds,
+                    batch_size=self.batch_size,
+                )
+                for train, test in cv.split(X, y)
+            )
+
+        return self
+
+    def _check_fit_args(self, X, y, sample_weight=None):
+        """Validate the fit arguments and set classes_.
+
+        Returns the indexable X and y, the base estimator, the checked
+        cross-validation splitter (None if cv="prefit") and the sample
+        weights to fit the base estimator with.
+        """
+        if np.dtype(self.dtype) not in (np.float32, np.float64):
+            raise ValueError(
+                "dtype should be np.float32 or np.float64. Got %s."
+                % (self.dtype,)
+            )
+        aggregate = self.aggregate
+        if not (
+            aggregate is None
+            or (isinstance(aggregate, str) and aggregate == "unique")
+            or (isinstance(aggregate, numbers.Integral) and aggregate >= 1)
+        ):
+            raise ValueError(
+                "aggregate should be None, 'unique' or a positive int. "
+                "Got %r." % (aggregate,)
+            )
         X, y = indexable(X, y)
         le = LabelBinarizer().fit(y)
         self.classes_ = le.classes_
@@ -148,7 +338,6 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
                 % (n_folds, n_folds)
             )
 
-        self.calibrated_classifiers_ = []
         if self.base_estimator is None:
             # we want all classifiers that don't expose a random_state
             # to be deterministic (and we don't want to expose this one).
@@ -157,58 +346,292 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
             base_estimator = self.base_estimator
 
         if self.cv == "prefit":
-            calibrated_classifier = _CalibratedClassifier(
-                base_estimator, method=self.method
+            return X, y, base_estimator, None, None
+        cv = check_cv(self.cv, y, classifier=True)
+        fit_parameters = signature(base_estimator.fit).parameters
+        estimator_name = type(base_estimator).__name__
+        if self.weighted_folds and "sample_weight" not in fit_parameters:
+            raise ValueError(
+                "weighted_folds=True requires %s to support sample_weight."
+                % estimator_name
             )
+        if sample_weight is not None and "sample_weight" not in fit_parameters:
+            warnings.warn(
+                "%s does not support sample_weight. Samples"
+                " weights are only used for the calibration"
+                " itself." % estimator_name,
+                stacklevel=3,
+            )
+            base_estimator_sample_weight = None
+        else:
             if sample_weight is not None:
-                calibrated_classifier.fit(X, y, sample_weight)
-            else:
-                calibrated_classifier.fit(X, y)
-            self.calibrated_classifiers_.append(calibrated_classifier)
+                check_consistent_length(y, sample_weight)
+            base_estimator_sample_weight = sample_weight
+        return X, y, base_estimator, cv, base_estimator_sample_weight
+
+    def recalibrate_partial(self, X, y, sample_weight=None):
+        """Update the calibration of the fitted model with new data.
+
+        The base estimators are left untouched, and the calibrators of all
+        calibrated classifiers are updated with the given batch, at a cost
+        proportional to its size. The batch must not have been used to fit
+        the base estimators, e.g. newly labeled data for cv="prefit".
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_features)
+            New calibration data.
+
+        y : array-like, shape (n_samples,)
+            Target values.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        check_is_fitted(self, ["classes_", "calibrated_classifiers_"])
+        X, y = indexable(X, y)
+        for calibrated_classifier in self.calibrated_classifiers_:
+            calibrated_classifier.partial_fit(X, y, sample_weight)
+        return self
+
+    def _calibrated_classifier(self, estimator, classes=None):
+        """Return an unfitted calibrated classifier wrapping estimator."""
+        return _CalibratedClassifier(
+            estimator,
+            method=self.method,
+            classes=classes,
+            lookup_bins=self.lookup_bins,
+            aggregate=self.aggregate,
+            dtype=self.dtype,
+        )
+
+    @property
+    def aggregation_error_(self):
+        """The largest score displacement caused by aggregate."""
+        check_is_fitted(self, ["classes_", "calibrated_classifiers_"])
+        return max(
+            calibrated_classifier.aggregation_error_
+            for calibrated_classifier in self.calibrated_classifiers_
+        )
+
+    def _fit_out_of_fold(
+        self,
+        base_estimator,
+        X,
+        y,
+        cv,
+        sample_weight,
+        base_estimator_sample_weight,
+    ):
+        """Calibrate a single classifier fitted on all the data.
+
+        The calibrator is fitted on the out-of-fold decision scores of
+        clones of base_estimator fitted on each cross-validation fold.
+        """
+        folds = list(cv.split(X, y))
+        fold_scores = self._fold_scores(
+            base_estimator, X, y, folds, base_estimator_sample_weight
+        )
+        df, idx_pos_class = _out_of_fold_scores(folds, fold_scores, len(y))
+        calibrated_classifier = self._calibrated_classifier(
+            _fit_fold_estimator(
+                clone(base_estimator),
+                X,
+                y,
+                slice(None),
+                base_estimator_sample_weight,
+            ),
+            classes=self.classes_,
+        )
+        calibrated_classifier._fit_label_encoder(y)
+        return calibrated_classifier._fit_calibrators(
+            df, idx_pos_class, y, sample_weight
+        )
+
+    def _fold_scores(
+        self, base_estimator, X, y, folds, base_estimator_sample_weight
+    ):
+        """Fit a clone of base_estimator per fold and score its test rows."""
+        return Parallel(n_jobs=self.n_jobs)(
+            delayed(_fold_decision_scores)(
+                clone(base_estimator),
+                X,
+                y,
+                train,
+                test,
+                classes=self.classes_,
+                base_estimator_sample_weight=base_estimator_sample_weight,
+                weighted=self.weighted_folds,
+                batch_size=self.batch_size,
+            )
+            for train, test in folds
+        )
+
+    def fit_methods(
+        self, X, y, methods=("sigmoid", "isotonic"), sample_weight=None
+    ):
+        """Fit the calibrated model once for each of several methods.
+
+        The base estimators are fitted only once, as in fit, and their
+        decision scores are shared by the calibrators of all methods, so
+        comparing methods costs about as much as a single fit. Every
+        returned model is scored by cross-calibration: the calibrator for
+        the rows of each fold is fitted on the decision scores of the other
+        folds only, so the scores are not biased by the calibrators seeing
+        their own evaluation data. With cv="prefit", the calibration rows
+        are split into 3 stratified folds for scoring.
+
+        Every training fold must contain all classes.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_features)
+            Training data.
+
+        y : array-like, shape (n_samples,)
+            Target values.
+
+        methods : sequence of str, default ('sigmoid', 'isotonic')
+            The calibration methods to fit.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        calibrated : dict
+            Maps every method to a fitted copy of this estimator that uses
+            it. Each copy has a calibration_scores_ attribute, a dict with
+            the cross-calibrated 'log_loss' and 'brier_score' of its
+            method on the training data, lower being better for both.
+
+        """
+        # fit a copy, so that this estimator is left as it is; the base
+        # estimator is shared, as it may be a prefit one
+        model = clone(self).set_params(base_estimator=self.base_estimator)
+        return model._fit_methods(X, y, methods, sample_weight)
+
+    def _fit_methods(self, X, y, methods, sample_weight):
+        """Fit the models of fit_methods, setting classes_ on self."""
+        X, y, base_estimator, cv, base_estimator_sample_weight = (
+            self._check_fit_args(X, y, sample_weight)
+        )
+        all_rows = np.arange(len(y))
+        if cv is None:
+            calibrated_classifier = self._calibrated_classifier(
+                base_estimator, classes=self.classes_
+            )
+            calibrated_classifier._fit_label_encoder(y)
+            df, idx_pos_class = calibrated_classifier._preproc(X)
+            calibration_sets = [(base_estimator, df, idx_pos_class, all_rows)]
+            folds = list(
+                check_cv(3, y, classifier=True).split(np.empty(len(y)), y)
+            )
+            fold_scores = [
+                (base_estimator, df[test], idx_pos_class) for _, test in folds
+            ]
         else:
-            cv = check_cv(self.cv, y, classifier=True)
-            fit_parameters = signature(base_estimator.fit).parameters
-            estimator_name = type(base_estimator).__name__
-            if (
-                sample_weight is not None
-                and "sample_weight" not in fit_parameters
-            ):
-                warnings.warn(
-                    "%s does not support sample_weight. Samples"
-                    " weights are only used for the calibration"
-                    " itself." % estimator_name,
-                    stacklevel=2,
-                )
-                base_estimator_sample_weight = None
-            else:
-                if sample_weight is not None:
-                    check_consistent_length(y, sample_weight)
-                base_estimator_sample_weight = sample_weight
-            for train, test in cv.split(X, y):
-                this_estimator = clone(base_estimator)
-                if base_estimator_sample_weight is not None:
-                    this_estimator.fit(
-                        X[train],
-                        y[train],
-                        sample_weight=base_estimator_sample_weight[train],
+            folds = list(cv.split(X, y))
+            fold_scores = self._fold_scores(
+                base_estimator, X, y, folds, base_estimator_sample_weight
+            )
+            if self.ensemble:
+                calibration_sets = [
+                    (estimator, df, idx_pos_class, test)
+                    for (_, test), (estimator, df, idx_pos_class) in zip(
+                        folds, fold_scores
                     )
-                else:
-                    this_estimator.fit(X[train], y[train])
+                ]
+            else:
+                df, idx_pos_class = _out_of_fold_scores(
+                    folds, fold_scores, len(y)
+                )
+                estimator = _fit_fold_estimator(
+                    clone(base_estimator),
+                    X,
+                    y,
+                    slice(None),
+                    base_estimator_sample_weight,
+                )
+                calibration_sets = [(estimator, df, idx_pos_class, all_rows)]
 
-                calibrated_classifier = _CalibratedClassifier(
-                    this_estimator, method=self.method, classes=self.classes_
+        calibrated = {}
+        for method in methods:
+            # the base estimator is shared, as it may be a prefit one
+            this_estimator = clone(self).set_params(
+                method=method, base_estimator=self.base_estimator
+            )
+            this_estimator.classes_ = self.classes_
+            this_estimator.calibrated_classifiers_ = [
+                this_estimator._calibrate_scores(
+                    estimator, df, idx_pos_class, y, rows, sample_weight
                 )
-                if sample_weight is not None:
-                    calibrated_classifier.fit(
-                        X[test], y[test], sample_weight[test]
-                    )
-                else:
-                    calibrated_classifier.fit(X[test], y[test])
-                self.calibrated_classifiers_.append(calibrated_classifier)
+                for estimator, df, idx_pos_class, rows in calibration_sets
+            ]
+            this_estimator.calibration_scores_ = (
+                this_estimator._cross_calibration_scores(
+                    folds, fold_scores, y, sample_weight
+                )
+            )
+            calibrated[method] = this_estimator
+        return calibrated
+
+    def _calibrate_scores(
+        self, estimator, df, idx_pos_class, y, rows, sample_weight=None
+    ):
+        """Calibrate estimator on its decision scores df of the given rows."""
+        calibrated_classifier = self._calibrated_classifier(
+            estimator, classes=self.classes_
+        )
+        calibrated_classifier._fit_label_encoder(y)
+        return calibrated_classifier._fit_calibrators(
+            df,
+            idx_pos_class,
+            y[rows],
+            None if sample_weight is None else sample_weight[rows],
+        )
 
-        return self
+    def _cross_calibration_scores(self, folds, fold_scores, y, sample_weight):
+        """Score the calibration of each fold by the other folds."""
+        _check_partition(folds, len(y), "fit_methods")
+        proba = np.empty((len(y), len(self.classes_)))
+        for k, (_, test) in enumerate(folds):
+            others = [j for j in range(len(folds)) if j != k]
+            rows = np.concatenate([folds[j][1] for j in others])
+            df = np.concatenate([fold_scores[j][1] for j in others])
+            estimator, fold_df, idx_pos_class = fold_scores[k]
+            calibrated_classifier = self._calibrate_scores(
+                estimator, df, idx_pos_class, y, rows, sample_weight
+            )
+            proba[test] = calibrated_classifier._calibrated_proba(
+                fold_df, idx_pos_class, np.empty((len(test), proba.shape[1]))
+            )
+        Y = label_binarize(y, classes=self.classes_)
+        if Y.shape[1] == 1:
+            # the usual binary Brier score only counts the positive class
+            proba = proba[:, 1:]
+        brier_score = np.average(
+            np.sum((Y - proba) ** 2, axis=1), weights=sample_weight
+        )
+        return {
+            "log_loss": float(
+                log_loss(
+                    y,
+                    proba if Y.shape[1] > 1 else proba[:, 0],
+                    sample_weight=sample_weight,
+                    labels=self.classes_,
+                )
+            ),
+            "brier_score": float(brier_score),
+        }
 
-    def predict_proba(self, X):
+    def predict_proba(self, X, out=None):
         """Posterior probabilities of classification.
 
         This function returns posterior probabilities of classification
@@ -219,23 +642,122 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
         X : array-like, shape (n_samples, n_features)
             The samples.
 
+        out : ndarray, shape (n_samples, n_classes), optional
+            A preallocated array to write the predicted probas into.
+
         Returns
         -------
         C : array, shape (n_samples, n_classes)
-            The predicted probas.
+            The predicted probas. If out was given, it is returned.
 
         """
         check_is_fitted(self, ["classes_", "calibrated_classifiers_"])
+        n_samples = _n_rows(X)
+        out = _check_proba_out(
+            out, n_samples, len(self.classes_), dtype=self.dtype
+        )
+        batch_size = self.batch_size or max(n_samples, 1)
+        n_calibrated = len(self.calibrated_classifiers_)
+        proba = None
         # Compute the arithmetic mean of the predictions of the calibrated
-        # classifiers
-        mean_proba = np.zeros((X.shape[0], len(self.classes_)))
-        for calibrated_classifier in self.calibrated_classifiers_:
-            proba = calibrated_classifier.predict_proba(X)
-            mean_proba += proba
+        # classifiers, chunk by chunk, accumulating in place
+        for batch in gen_batches(n_samples, batch_size):
+            X_batch = X if batch_size >= n_samples else _rows(X, batch)
+            mean_proba = out[batch]
+            if n_calibrated == 1:
+                self.calibrated_classifiers_[0].predict_proba(
+                    X_batch, out=mean_proba
+                )
+                continue
+            if proba is None:
+                proba = np.empty(
+                    (batch_size, len(self.classes_)), dtype=self.dtype
+                )
+                # sparse products cost the same per fold column whether
+                # stacked or not, so only dense X gains from stacking; other
+                # inputs, e.g. data frames or float32 arrays, are left to the
+                # validation and precision of every fold estimator
+                linear_folds = (
+                    self._linear_folds()
+                    if isinstance(X, np.ndarray) and X.dtype == np.float64
+                    else None
+                )
+            mean_proba.fill(0.0)
+            if linear_folds is not None:
+                # the scores of all folds in a single matrix product
+                coef, intercept, offsets = linear_folds
+                X_batch = check_array(X_batch)
+                if X_batch.shape[1] != coef.shape[0]:
+                    raise ValueError(
+                        "X has %d features, but the model expects %d."
+                        % (X_batch.shape[1], coef.shape[0])
+                    )
+                scores = X_batch @ coef
+                scores += intercept
+                scores = scores.astype(self.dtype, copy=False)
+            for k, calibrated_classifier in enumerate(
+                self.calibrated_classifiers_
+            ):
+                if linear_folds is None:
+                    calibrated_classifier.predict_proba(
+                        X_batch, out=proba[: len(mean_proba)]
+                    )
+                else:
+                    calibrated_classifier._calibrated_proba(
+                        scores[:, offsets[k] : offsets[k + 1]],
+                        calibrated_classifier._idx_pos_class(),
+                        proba[: len(mean_proba)],
+                    )
+                mean_proba += proba[: len(mean_proba)]
+            mean_proba /= n_calibrated
 
-        mean_proba /= len(self.calibrated_classifiers_)
+        return out
+
+    def _linear_folds(self):
+        """Return the stacked coefficients of linear fold estimators.
+
+        If every fold estimator is a linear classifier fitted without
+        feature names, the decision scores of all folds of a float64 X are
+        given by a single product with their stacked coef_ matrices, i.e.
+        one BLAS call instead of one pass over X per fold. Returns None
+        otherwise, or the stacked (n_features, n_columns) coefficients and
+        (n_columns,) intercepts, and the offsets of the columns of every
+        fold. The result is cached until the calibrated classifiers change.
+        """
+        cache = getattr(self, "_linear_folds_cache", None)
+        if cache is not None and cache[0] is self.calibrated_classifiers_:
+            return cache[1]
+        estimators = [
+            calibrated_classifier.base_estimator
+            for calibrated_classifier in self.calibrated_classifiers_
+        ]
+        linear_folds = None
+        if all(
+            _is_linear_classifier(estimator)
+            and not hasattr(estimator, "feature_names_in_")
+            for estimator in estimators
+        ):
+            coef = np.vstack([estimator.coef_ for estimator in estimators])
+            intercept = np.concatenate(
+                [
+                    np.broadcast_to(
+                        estimator.intercept_, estimator.coef_.shape[:1]
+                    )
+                    for estimator in estimators
+                ]
+            )
+            offsets = np.cumsum(
+                [0] + [estimator.coef_.shape[0] for estimator in estimators]
+            )
+            linear_folds = (np.ascontiguousarray(coef.T), intercept, offsets)
+        self._linear_folds_cache = (self.calibrated_classifiers_, linear_folds)
+        return linear_folds
 
-        return mean_proba
+    def __getstate__(self):
+        """Drop the stacked fold coefficients, which are cheap to rebuild."""
+        state = super().__getstate__()
+        state.pop("_linear_folds_cache", None)
+        return state
 
     def predict(self, X):
         """Predict the target of new samples.
@@ -258,6 +780,228 @@ class UnsafeCalibratedClassifierCV(BaseEstimator, ClassifierMixin):
         return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
 
 
+# the decision function X @ coef_.T + intercept_ that all linear
+# classifiers of sklearn inherit, reached through a public class
+_LINEAR_DECISION_FUNCTION = LinearSVC.decision_function
+
+
+def _is_linear_classifier(estimator):
+    """Whether decision_function of estimator is X @ coef_.T + intercept_."""
+    decision_function = getattr(type(estimator), "decision_function", None)
+    return decision_function is _LINEAR_DECISION_FUNCTION and isinstance(
+        getattr(estimator, "coef_", None), np.ndarray
+    )
+
+
+def _check_proba_out(out, n_samples, n_classes, dtype=np.float64):
+    """Validate a preallocated output array, or allocate one of dtype."""
+    if out is None:
+        return np.zeros((n_samples, n_classes), dtype=dtype)
+    if out.shape != (n_samples, n_classes):
+        raise ValueError(
+            "out should have shape %s. Got %s."
+            % ((n_samples, n_classes), out.shape)
+        )
+    return out
+
+
+def _fit_calibrated_fold(
+    calibrated_classifier,
+    X,
+    y,
+    train,
+    test,
+    sample_weight=None,
+    base_estimator_sample_weight=None,
+    weighted=False,
+    batch_size=None,
+):
+    """Fit an estimator on a train fold and calibrate it on the test fold.
+
+    Parameters
+    ----------
+    calibrated_classifier : _CalibratedClassifier
+        An unfitted calibrated classifier, wrapping an unfitted clone of the
+        base estimator.
+
+    X : array-like, shape (n_samples, n_features)
+        Training data.
+
+    y : array-like, shape (n_samples,)
+        Target values.
+
+    train, test : ndarray
+        Indices of the train and test (calibration) rows of this fold.
+
+    sample_weight : array-like, shape = [n_samples] or None
+        Sample weights used for calibration.
+
+    base_estimator_sample_weight : array-like, shape = [n_samples] or None
+        Sample weights used to fit the estimator.
+
+    weighted : bool, default False
+        Whether to fit the estimator on all of X, with zero weights for the
+        rows outside the train fold, instead of on a copy of the train rows.
+
+    batch_size : int or None, optional
+        If given, the test rows are scored in chunks of this many rows.
+
+    Returns
+    -------
+    calibrated_classifier : _CalibratedClassifier
+        The calibrated classifier of this fold.
+
+    """
+    _fit_fold_estimator(
+        calibrated_classifier.base_estimator,
+        X,
+        y,
+        train,
+        base_estimator_sample_weight,
+        weighted,
+    )
+    calibrated_classifier._fit_label_encoder(y[test])
+    df, idx_pos_class = _score_rows(calibrated_classifier, X, test, batch_size)
+    return calibrated_classifier._fit_calibrators(
+        df,
+        idx_pos_class,
+        y[test],
+        None if sample_weight is None else sample_weight[test],
+    )
+
+
+def _fit_fold_estimator(
+    estimator, X, y, train, sample_weight=None, weighted=False
+):
+    """Fit an estimator on the train rows of a fold.
+
+    If weighted is True, the estimator is fitted on all of X and y, with
+    zero weights for the rows outside train, so that the train rows are
+    never copied. This is only equivalent for estimators that ignore rows
+    of zero weight.
+    """
+    if weighted:
+        fold_weight = np.zeros(_n_rows(y))
+        if sample_weight is None:
+            fold_weight[train] = 1.0
+        else:
+            fold_weight[train] = sample_weight[train]
+        estimator.fit(X, y, sample_weight=fold_weight)
+    elif sample_weight is not None:
+        estimator.fit(X[train], y[train], sample_weight=sample_weight[train])
+    else:
+        estimator.fit(X[train], y[train])
+    return estimator
+
+
+def _score_rows(calibrated_classifier, X, rows, batch_size=None):
+    """Return the decision scores of the given rows of X, in chunks."""
+    if batch_size is None or batch_size >= len(rows):
+        return calibrated_classifier._preproc(_rows(X, rows))
+    df_batches = []
+    for batch in gen_batches(len(rows), batch_size):
+        df, idx_pos_class = calibrated_classifier._preproc(
+            _rows(X, rows[batch])
+        )
+        df_batches.append(df)
+    return np.concatenate(df_batches), idx_pos_class
+
+
+def _fold_decision_scores(
+    estimator,
+    X,
+    y,
+    train,
+    test,
+    classes,
+    base_estimator_sample_weight=None,
+    weighted=False,
+    batch_size=None,
+):
+    """Fit an estimator on a train fold and score its test fold.
+
+    Parameters
+    ----------
+    estimator : instance BaseEstimator
+        An unfitted clone of the base estimator.
+
+    X : array-like, shape (n_samples, n_features)
+        Training data.
+
+    y : array-like, shape (n_samples,)
+        Target values.
+
+    train, test : ndarray
+        Indices of the train and test rows of this fold.
+
+    classes : array-like, shape (n_classes,)
+        The class labels of the entire training set.
+
+    base_estimator_sample_weight : array-like, shape = [n_samples] or None
+        Sample weights used to fit the estimator.
+
+    weighted : bool, default False
+        Whether to fit the estimator on all of X, with zero weights for the
+        rows outside the train fold, instead of on a copy of the train rows.
+
+    batch_size : int or None, optional
+        If given, the test rows are scored in chunks of this many rows.
+
+    Returns
+    -------
+    estimator : instance BaseEstimator
+        The estimator, fitted on the train rows.
+
+    df : ndarray, shape (n_test_samples, n_columns)
+        The decision scores of the test rows, as given by
+        _CalibratedClassifier._preproc.
+
+    idx_pos_class : ndarray
+        The indices of the classes of the columns of df.
+
+    """
+    fold_classes = np.unique(y[train])
+    if len(fold_classes) != len(classes):
+        raise ValueError(
+            "Every training fold must contain all classes to combine "
+            "out-of-fold scores. Got a fold with classes %s out of %s."
+            % (fold_classes, classes)
+        )
+    _fit_fold_estimator(
+        estimator, X, y, train, base_estimator_sample_weight, weighted
+    )
+    calibrated_classifier = _CalibratedClassifier(estimator, classes=classes)
+    calibrated_classifier._fit_label_encoder(y)
+    return (estimator,) + _score_rows(
+        calibrated_classifier, X, test, batch_size
+    )
+
+
+def _check_partition(folds, n_samples, name):
+    """Raise unless every row is in exactly one test fold."""
+    test_rows = np.concatenate([test for _, test in folds])
+    if len(test_rows) != n_samples or not np.array_equal(
+        np.sort(test_rows), np.arange(n_samples)
+    ):
+        # as in cross_val_predict, rows of no or several folds have no
+        # single out-of-fold score
+        raise ValueError(
+            "{} only works for cross-validation test folds that partition "
+            "the rows, each row in exactly one test fold.".format(name)
+        )
+
+
+def _out_of_fold_scores(folds, fold_scores, n_samples):
+    """Assemble the decision scores of all test folds, in row order."""
+    _check_partition(folds, n_samples, "ensemble=False")
+    # every fold knows all classes, so the columns agree between folds
+    _, df_0, idx_pos_class = fold_scores[0]
+    df = np.empty((n_samples, df_0.shape[1]))
+    for (_, test), (_, fold_df, _) in zip(folds, fold_scores):
+        df[test] = fold_df
+    return df, idx_pos_class
+
+
 class _CalibratedClassifier(object):
     """Probability calibration with isotonic regression or sigmoid.
 
@@ -273,16 +1017,32 @@ class _CalibratedClassifier(object):
         to offer more accurate predict_proba outputs. No default value since
         it has to be an already fitted estimator.
 
-    method : 'sigmoid' | 'isotonic'
+    method : 'sigmoid' | 'isotonic' | 'temperature' | 'vector'
         The method to use for calibration. Can be 'sigmoid' which
-        corresponds to Platt's method or 'isotonic' which is a
-        non-parametric approach based on isotonic regression.
+        corresponds to Platt's method, 'isotonic' which is a
+        non-parametric approach based on isotonic regression, or
+        'temperature' and 'vector', which scale the decision scores of all
+        classes jointly before a softmax.
 
     classes : array-like, shape (n_classes,), optional
             Contains unique classes used to fit the base estimator.
             if None, then classes is extracted from the given target values
             in fit().
 
+    lookup_bins : int, optional
+        If given, the fitted calibrators are compiled into lookup tables of
+        this many bins. Ignored for the 'temperature' and 'vector' methods.
+
+    aggregate : None, 'unique' or int, optional
+        If given, the calibrators are fitted on the calibration scores
+        aggregated by _aggregate_scores. Ignored for the 'temperature' and
+        'vector' methods.
+
+    dtype : {np.float64, np.float32}, default np.float64
+        The floating point type the sigmoids are fitted in, and of the
+        probabilities allocated by predict_proba. Decision scores are
+        calibrated in the floating point type of the output array.
+
     References
     ----------
     .. [1] Obtaining calibrated probability estimates from decision trees
@@ -299,10 +1059,21 @@ class _CalibratedClassifier(object):
 
     """
 
-    def __init__(self, base_estimator, method="sigmoid", classes=None):
+    def __init__(
+        self,
+        base_estimator,
+        method="sigmoid",
+        classes=None,
+        lookup_bins=None,
+        aggregate=None,
+        dtype=np.float64,
+    ):
         self.base_estimator = base_estimator
         self.method = method
         self.classes = classes
+        self.lookup_bins = lookup_bins
+        self.aggregate = aggregate
+        self.dtype = dtype
 
     def _preproc(self, X):
         n_classes = len(self.classes_)
@@ -319,11 +1090,11 @@ class _CalibratedClassifier(object):
                 "classifier has no decision_function or predict_proba method."
             )
 
-        idx_pos_class = self.label_encoder_.transform(
-            self.base_estimator.classes_
-        )
+        return df, self._idx_pos_class()
 
-        return df, idx_pos_class
+    def _idx_pos_class(self):
+        """Return the indices of the classes of the base estimator."""
+        return self.label_encoder_.transform(self.base_estimator.classes_)
 
     def fit(self, X, y, sample_weight=None):
         """Calibrate the fitted model.
@@ -345,34 +1116,155 @@ class _CalibratedClassifier(object):
             Returns an instance of self.
 
         """
+        self._fit_label_encoder(y)
+        df, idx_pos_class = self._preproc(X)
+        return self._fit_calibrators(df, idx_pos_class, y, sample_weight)
+
+    def _softmax_logits(self, df, idx_pos_class):
+        """Return the logit matrix of decision scores, and its classes.
+
+        The columns of the logit matrix are the classes known to the base
+        estimator, given as the indices of their columns in predict_proba.
+        Binary decision scores d are mapped to the logits (0, d), and
+        predicted probabilities to their logarithms.
+        """
+        if not hasattr(self.base_estimator, "decision_function"):
+            eps = np.finfo(df.dtype).eps
+            df = np.clip(df, eps, 1.0 - eps)
+            if len(self.classes_) == 2:
+                return np.hstack([np.log1p(-df), np.log(df)]), idx_pos_class
+            return np.log(df), idx_pos_class
+        if len(self.classes_) == 2:
+            df = np.hstack([np.zeros_like(df), df])
+        return df, idx_pos_class[: df.shape[1]]
+
+    def _fit_label_encoder(self, y):
         self.label_encoder_ = LabelEncoder()
         if self.classes is None:
             self.label_encoder_.fit(y)
         else:
             self.label_encoder_.fit(self.classes)
-
         self.classes_ = self.label_encoder_.classes_
-        Y = label_binarize(y, self.classes_)
+        return self
 
-        df, idx_pos_class = self._preproc(X)
+    def _fit_calibrators(self, df, idx_pos_class, y, sample_weight=None):
+        """Fit the calibrators on decision scores given by _preproc."""
+        Y = label_binarize(y, classes=self.classes_)
         self.calibrators_ = []
-
-        for k, this_df in zip(idx_pos_class, df.T):
-            if self.method == "isotonic":
-                calibrator = IsotonicRegression(out_of_bounds="clip")
-            elif self.method == "sigmoid":
-                calibrator = _SigmoidCalibration()
+        self.aggregation_error_ = 0.0
+
+        if self.method in _SOFTMAX_METHODS:
+            # a single calibrator for the scores of all classes
+            logits, columns = self._softmax_logits(df, idx_pos_class)
+            calibrator = _SoftmaxCalibration(vector=self.method == "vector")
+            calibrator.fit(
+                logits, _class_indicators(Y)[:, columns], sample_weight
+            )
+            self.calibrators_ = [calibrator]
+            return self
+        elif self.method == "sigmoid":
+            # all one-vs-rest sigmoids are fitted in a single solve
+            idx_pos_class = idx_pos_class[: df.shape[1]]
+            if self.aggregate is None:
+                state = _batch_sigmoid_update(
+                    df, Y[:, idx_pos_class], sample_weight, dtype=self.dtype
+                )
             else:
-                raise ValueError(
-                    'method should be "sigmoid" or '
-                    '"isotonic". Got %s.' % self.method
+                this_Y = Y[:, idx_pos_class]
+                # Platt's targets depend on the raw class counts
+                n_neg = np.sum(this_Y <= 0, axis=0).astype(np.float64)
+                points, self.aggregation_error_ = _aggregate_scores(
+                    df, this_Y, sample_weight, self.aggregate, by_label=True
+                )
+                state = _batch_sigmoid_update(
+                    *points,
+                    dtype=self.dtype,
+                    counts=(n_neg, len(this_Y) - n_neg),
+                )
+            self.calibrators_ = [
+                _SigmoidCalibration()._set_state(state, k)
+                for k in range(len(idx_pos_class))
+            ]
+        elif self.method == "isotonic":
+            this_Y = Y[:, idx_pos_class[: df.shape[1]]]
+            points = zip(df.T, this_Y.T, repeat(sample_weight))
+            if self.aggregate is not None:
+                (F, T, W), self.aggregation_error_ = _aggregate_scores(
+                    df, this_Y, sample_weight, self.aggregate
+                )
+                points = (
+                    (F[W[:, k] > 0, k], T[W[:, k] > 0, k], W[W[:, k] > 0, k])
+                    for k in range(F.shape[1])
+                )
+            for this_df, this_y, this_weight in points:
+                calibrator = _IsotonicCalibration()
+                calibrator.fit(this_df, this_y, this_weight)
+                self.calibrators_.append(calibrator)
+        else:
+            raise ValueError(
+                'method should be "sigmoid", "isotonic", "temperature" or '
+                '"vector". Got %s.' % self.method
+            )
+
+        if self.lookup_bins:
+            self.calibrators_ = [
+                _LookupTableCalibration(calibrator, self.lookup_bins).fit(
+                    this_df
                 )
-            calibrator.fit(this_df, Y[:, k], sample_weight)
-            self.calibrators_.append(calibrator)
+                for calibrator, this_df in zip(self.calibrators_, df.T)
+            ]
+        return self
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """Update the calibration with a new batch of data.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_features)
+            Training data.
+
+        y : array-like, shape (n_samples,)
+            Target values.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
 
+        """
+        if not hasattr(self, "calibrators_"):
+            return self.fit(X, y, sample_weight)
+        Y = label_binarize(y, classes=self.classes_)
+        df, idx_pos_class = self._preproc(X)
+        if self.method in _SOFTMAX_METHODS:
+            logits, columns = self._softmax_logits(df, idx_pos_class)
+            self.calibrators_[0].partial_fit(
+                logits, _class_indicators(Y)[:, columns], sample_weight
+            )
+            return self
+        idx_pos_class = idx_pos_class[: len(self.calibrators_)]
+        if self.method == "sigmoid" and not self.lookup_bins:
+            # all one-vs-rest sigmoids are updated in a single solve
+            state = _batch_sigmoid_update(
+                df,
+                Y[:, idx_pos_class],
+                sample_weight,
+                state=_stack_sigmoid_states(self.calibrators_),
+                dtype=self.dtype,
+            )
+            for k, calibrator in enumerate(self.calibrators_):
+                calibrator._set_state(state, k)
+        else:
+            for k, this_df, calibrator in zip(
+                idx_pos_class, df.T, self.calibrators_
+            ):
+                calibrator.partial_fit(this_df, Y[:, k], sample_weight)
         return self
 
-    def predict_proba(self, X):
+    def predict_proba(self, X, out=None):
         """Posterior probabilities of classification.
 
         This function returns posterior probabilities of classification
@@ -383,104 +1275,513 @@ class _CalibratedClassifier(object):
         X : array-like, shape (n_samples, n_features)
             The samples.
 
+        out : ndarray, shape (n_samples, n_classes), optional
+            A preallocated array to write the predicted probas into.
+
         Returns
         -------
         C : array, shape (n_samples, n_classes)
-            The predicted probas. Can be exact zeros.
+            The predicted probas. Can be exact zeros. If out was given, it is
+            returned.
 
         """
-        n_classes = len(self.classes_)
-        proba = np.zeros((X.shape[0], n_classes))
-
+        proba = _check_proba_out(
+            out, _n_rows(X), len(self.classes_), dtype=self.dtype
+        )
         df, idx_pos_class = self._preproc(X)
+        return self._calibrated_proba(df, idx_pos_class, proba)
 
-        for k, this_df, calibrator in zip(
-            idx_pos_class, df.T, self.calibrators_
-        ):
-            if n_classes == 2:
-                k += 1
-            proba[:, k] = calibrator.predict(this_df)
+    def _calibrated_proba(self, df, idx_pos_class, proba):
+        """Write the calibrated probas of decision scores df into proba."""
+        n_classes = len(self.classes_)
+        # calibrate in the floating point type of the output
+        df = np.asarray(df, dtype=proba.dtype)
+        proba.fill(0.0)
+        if self.method in _SOFTMAX_METHODS:
+            logits, columns = self._softmax_logits(df, idx_pos_class)
+            proba[:, columns] = self.calibrators_[0].predict(logits)
+            return proba
+        if n_classes == 2:
+            idx_pos_class = idx_pos_class + 1
+
+        if self.method == "sigmoid" and not self.lookup_bins:
+            # apply all sigmoids with a single broadcasted expression, with
+            # expit, as exp overflows float32 on scores of moderate size
+            a = np.array(
+                [calibrator.a_ for calibrator in self.calibrators_],
+                dtype=df.dtype,
+            )
+            b = np.array(
+                [calibrator.b_ for calibrator in self.calibrators_],
+                dtype=df.dtype,
+            )
+            proba[:, idx_pos_class[: len(a)]] = expit(
+                -(df[:, : len(a)] * a + b)
+            )
+        else:
+            for k, this_df, calibrator in zip(
+                idx_pos_class, df.T, self.calibrators_
+            ):
+                proba[:, k] = calibrator.predict(this_df)
 
         # Normalize the probabilities
         if n_classes == 2:
-            proba[:, 0] = 1.0 - proba[:, 1]
+            np.subtract(1.0, proba[:, 1], out=proba[:, 0])
         else:
-            proba /= np.sum(proba, axis=1)[:, np.newaxis]
+            with np.errstate(invalid="ignore"):
+                proba /= np.sum(proba, axis=1)[:, np.newaxis]
 
         # XXX : for some reason all probas can be 0
-        proba[np.isnan(proba)] = 1.0 / n_classes
+        np.copyto(proba, 1.0 / n_classes, where=np.isnan(proba))
 
         # Deal with cases where the predicted probability minimally exceeds 1.0
-        proba[(proba > 1.0) & (proba <= 1.0 + 1e-5)] = 1.0
+        np.minimum(proba, 1.0, out=proba, where=proba <= 1.0 + 1e-5)
 
         return proba
 
 
-def _sigmoid_calibration(df, y, sample_weight=None):
-    """Probability Calibration with sigmoid method (Platt 2000).
+def _aggregate_scores(df, Y, sample_weight, aggregate, by_label=False):
+    """Collapse the calibration rows of every column into weighted points.
 
     Parameters
     ----------
-    df : ndarray, shape (n_samples,)
+    df : ndarray, shape (n_samples, n_columns)
         The decision function or predict proba for the samples.
 
-    y : ndarray, shape (n_samples,)
-        The targets.
+    Y : ndarray, shape (n_samples, n_columns)
+        The binary targets of each column.
 
     sample_weight : array-like, shape = [n_samples] or None
         Sample weights. If None, then samples are equally weighted.
 
+    aggregate : 'unique' or int
+        With 'unique', the rows of equal score are merged. With an integer,
+        the rows of each of this many quantile bins of the scores are merged
+        at their mean score.
+
+    by_label : bool, default False
+        If True, positive and negative rows are never merged, so that every
+        point has a binary target. Otherwise, the target of a point is the
+        weighted mean of the targets of its rows.
+
     Returns
     -------
-    a : float
-        The slope.
-
-    b : float
-        The intercept.
+    points : tuple of three ndarrays, shape (n_points, n_columns)
+        The scores, targets and weights of the points of every column, in
+        increasing score order. Columns with fewer points than others are
+        padded with points of zero weight.
 
-    References
-    ----------
-    Platt, "Probabilistic Outputs for Support Vector Machines"
+    error : float
+        The largest distance between the score of a row and that of its
+        point.
 
     """
-    df = column_or_1d(df)
+    if sample_weight is None:
+        sample_weight = np.ones(df.shape[0])
+    columns = []
+    error = 0.0
+    for x, y in zip(df.T, Y.T):
+        if aggregate == "unique":
+            scores, groups = np.unique(x, return_inverse=True)
+        else:
+            # quantiles of a strided subsample are plenty to place the bin
+            # edges, as the reported error is measured on all rows anyway
+            sample = x[:: max(1, len(x) // (64 * aggregate))]
+            edges = np.quantile(sample, np.linspace(0, 1, aggregate + 1))
+            groups = np.searchsorted(edges[1:-1], x, side="right")
+        if by_label:
+            groups = 2 * groups + (y > 0)
+        n_rows = np.bincount(groups)
+        nonempty = np.flatnonzero(n_rows)
+        weight = np.bincount(groups, weights=sample_weight)[nonempty]
+        if aggregate == "unique":
+            point_x = scores[nonempty // 2 if by_label else nonempty]
+        else:
+            point_x = np.bincount(groups, weights=x)[nonempty]
+            point_x /= n_rows[nonempty]
+            # the score of a row's point, indexed by the row's group
+            group_x = np.zeros(len(n_rows))
+            group_x[nonempty] = point_x
+            error = max(error, float(np.max(np.abs(x - group_x[groups]))))
+        if by_label:
+            point_y = (nonempty % 2).astype(np.float64)
+        else:
+            point_y = np.bincount(groups, weights=sample_weight * y)[nonempty]
+            np.divide(point_y, weight, out=point_y, where=weight > 0)
+        columns.append((point_x, point_y, weight))
+
+    n_points = max(len(point_x) for point_x, _, _ in columns)
+    points = np.zeros((3, n_points, len(columns)))
+    for k, column in enumerate(columns):
+        points[:, : len(column[0]), k] = column
+    return tuple(points), error
+
+
+def _sigmoid_calibration(
+    df, y, sample_weight=None, max_iter=100, tol=None, dtype=np.float64
+):
+    """Probability Calibration with sigmoid method (Platt 2000).
+
+    The two parameters are fitted with Newton's method, using the analytic
+    2x2 Hessian and a backtracking line search (Lin et al. 2007). Every
+    iteration makes a single pass of transcendental functions over the
+    samples, shared by the objective, the gradient and the Hessian, and
+    convergence typically takes a handful of iterations.
+
+    Parameters
+    ----------
+    df : ndarray, shape (n_samples,)
+        The decision function or predict proba for the samples.
+
+    y : ndarray, shape (n_samples,)
+        The targets.
+
+    sample_weight : array-like, shape = [n_samples] or None
+        Sample weights. If None, then samples are equally weighted.
+
+    max_iter : int, default 100
+        The maximal number of Newton iterations.
+
+    tol : float, optional
+        Convergence tolerance on the relative size of a Newton step. By
+        default, the square root of the machine epsilon of dtype.
+
+    dtype : numpy dtype, default np.float64
+        The floating point type of the per-sample computations. np.float32
+        halves the memory traffic of the fit, at the cost of fitting the
+        parameters to about 1e-4 relative precision only.
+
+    Returns
+    -------
+    a : float
+        The slope.
+
+    b : float
+        The intercept.
+
+    References
+    ----------
+    Platt, "Probabilistic Outputs for Support Vector Machines"
+
+    Lin, Lin and Weng, "A note on Platt's probabilistic outputs for support
+    vector machines", Machine Learning 68 (2007)
+
+    """
+    df = column_or_1d(df)
     y = column_or_1d(y)
+    a, b = _batch_sigmoid_calibration(
+        df[:, np.newaxis],
+        y[:, np.newaxis],
+        sample_weight,
+        max_iter=max_iter,
+        tol=tol,
+        dtype=dtype,
+    )
+    return a[0], b[0]
+
+
+_SIGMOID_BLOCK_CELLS = 2**18
+
+
+def _batch_sigmoid_calibration(
+    df, Y, sample_weight=None, max_iter=100, tol=None, dtype=np.float64
+):
+    """Fit an independent Platt sigmoid to every column in a single solve.
+
+    Parameters
+    ----------
+    df : ndarray, shape (n_samples, n_columns)
+        The decision function or predict proba for the samples.
+
+    Y : ndarray, shape (n_samples, n_columns)
+        The binary targets of each column.
+
+    sample_weight : array-like, shape = [n_samples] or None
+        Sample weights. If None, then samples are equally weighted.
+
+    max_iter : int, default 100
+        The maximal number of Newton iterations.
 
-    F = df  # F follows Platt's notations
-    tiny = np.finfo(np.float).tiny  # to avoid division by 0 warning
+    tol : float, optional
+        Convergence tolerance on the relative size of a Newton step. By
+        default, the square root of the machine epsilon of dtype.
+
+    dtype : numpy dtype, default np.float64
+        The floating point type of the per-sample computations.
+
+    Returns
+    -------
+    a : ndarray, shape (n_columns,)
+        The slopes.
+
+    b : ndarray, shape (n_columns,)
+        The intercepts.
+
+    """
+    state = _batch_sigmoid_update(
+        df, Y, sample_weight, max_iter=max_iter, tol=tol, dtype=dtype
+    )
+    return state.a, state.b
+
+
+_SigmoidState = namedtuple(
+    "_SigmoidState", ["a", "b", "hessian", "n_neg", "n_pos"]
+)
+
+
+def _batch_sigmoid_update(
+    df,
+    Y,
+    sample_weight=None,
+    state=None,
+    max_iter=100,
+    tol=None,
+    dtype=np.float64,
+    counts=None,
+):
+    """Fit, or update with new samples, a Platt sigmoid of every column.
+
+    The K two-parameter problems are solved together by a vectorized Newton
+    method over the (n_samples, K) decision matrix, so the number of
+    Python-level iterations does not grow with K. Columns are processed in
+    blocks of about _SIGMOID_BLOCK_CELLS matrix cells.
+
+    When updating, the samples of all previous calls are summarized by a
+    quadratic approximation of their loss around the current parameters,
+    given by its accumulated Hessian, and by their class counts. An update
+    thus costs time proportional to the new samples only.
+
+    Parameters
+    ----------
+    df : ndarray, shape (n_samples, n_columns)
+        The decision function or predict proba for the samples.
+
+    Y : ndarray, shape (n_samples, n_columns)
+        The binary targets of each column.
+
+    sample_weight : array-like, shape = [n_samples] or None
+        Sample weights. If None, then samples are equally weighted. Can also
+        be of shape (n_samples, n_columns), to weight every column apart.
+
+    state : _SigmoidState, optional
+        The state returned by a previous call, to update with the samples.
+        If None, the sigmoids are fitted from scratch.
+
+    max_iter : int, default 100
+        The maximal number of Newton iterations.
+
+    tol : float, optional
+        Convergence tolerance on the relative size of a Newton step. By
+        default, the square root of the machine epsilon of dtype.
+
+    dtype : numpy dtype, default np.float64
+        The floating point type of the per-sample computations.
+
+    counts : tuple of two ndarrays, shape (n_columns,), optional
+        The numbers of negative and positive samples of every column, from
+        which Platt's targets are computed. By default, the rows of Y are
+        counted; aggregated samples must pass the counts of the raw ones.
+
+    Returns
+    -------
+    state : _SigmoidState
+        The slopes a, intercepts b, accumulated (aa, ab, bb) Hessian entries
+        and negative and positive sample counts of every column.
+
+    """
+    # column-major storage keeps every per-column reduction contiguous
+    F = np.asfortranarray(df, dtype=dtype)  # F follows Platt's notations
+    Y = np.asarray(Y)
+    if sample_weight is not None:
+        sample_weight = np.asarray(sample_weight, dtype=dtype)
 
     # Bayesian priors (see Platt end of section 2.2)
-    prior0 = float(np.sum(y <= 0))
-    prior1 = y.shape[0] - prior0
-    T = np.zeros(y.shape)
-    T[y > 0] = (prior1 + 1.0) / (prior1 + 2.0)
-    T[y <= 0] = 1.0 / (prior0 + 2.0)
-    T1 = 1.0 - T
+    if counts is None:
+        prior0 = np.sum(Y <= 0, axis=0).astype(np.float64)
+        prior1 = Y.shape[0] - prior0
+    else:
+        prior0, prior1 = (
+            np.array(count, dtype=np.float64) for count in counts
+        )
+    if state is not None:
+        prior0 += state.n_neg
+        prior1 += state.n_pos
+    T = np.empty(Y.shape, dtype=dtype, order="F")
+    np.copyto(T, (prior1 + 1.0) / (prior1 + 2.0), where=Y > 0)
+    np.copyto(T, 1.0 / (prior0 + 2.0), where=Y <= 0)
+
+    if state is None:
+        a = np.zeros(Y.shape[1])
+        b = np.log((prior0 + 1.0) / (prior1 + 1.0))
+        prior = np.zeros((Y.shape[1], 3))
+    else:
+        a = np.array(state.a, dtype=np.float64)
+        b = np.array(state.b, dtype=np.float64)
+        prior = np.asarray(state.hessian, dtype=np.float64)
+    hessian = prior.copy()
+    # columns are solved in blocks keeping the per-iteration temporaries
+    # cache-sized; one block of all columns is memory-bound for large inputs
+    block = max(1, _SIGMOID_BLOCK_CELLS // max(1, F.shape[0]))
+    for start in range(0, F.shape[1], block):
+        cols = slice(start, start + block)
+        a[cols], b[cols], block_hessian = _platt_newton(
+            F[:, cols],
+            T[:, cols],
+            sample_weight
+            if sample_weight is None or sample_weight.ndim == 1
+            else sample_weight[:, cols],
+            a[cols],
+            b[cols],
+            max_iter,
+            tol,
+            prior=prior[cols],
+        )
+        hessian[cols] += block_hessian
+    return _SigmoidState(a, b, hessian, prior0, prior1)
 
-    def objective(AB):
-        # From Platt (beginning of Section 2.2)
-        E = np.exp(AB[0] * F + AB[1])
-        P = 1.0 / (1.0 + E)
-        l = -(T * np.log(P + tiny) + T1 * np.log(1.0 - P + tiny))  # noqa
-        if sample_weight is not None:
-            return (sample_weight * l).sum()
-        else:
-            return l.sum()
 
-    def grad(AB):
-        # gradient of the objective function
-        E = np.exp(AB[0] * F + AB[1])
-        P = 1.0 / (1.0 + E)
-        TEP_minus_T1P = P * (T * E - T1)
-        if sample_weight is not None:
-            TEP_minus_T1P *= sample_weight
-        dA = np.dot(TEP_minus_T1P, F)
-        dB = np.sum(TEP_minus_T1P)
-        return np.array([dA, dB])
+def _platt_newton(
+    F, T, sample_weight, a, b, max_iter=100, tol=None, prior=None
+):
+    """Minimize Platt's negative log-likelihood with Newton's method.
+
+    Parameters
+    ----------
+    F : ndarray, shape (n_samples, n_columns)
+        The decision function or predict proba for the samples.
+
+    T : ndarray, shape (n_samples, n_columns)
+        The regularized targets, of the same dtype as F.
+
+    sample_weight : ndarray, shape (n_samples,) or None
+        Sample weights, of the same dtype as F. Can also be of the shape of
+        F, to weight every column apart.
+
+    a, b : ndarray, shape (n_columns,)
+        The starting slopes and intercepts.
+
+    max_iter : int, default 100
+        The maximal number of Newton iterations.
+
+    tol : float, optional
+        Convergence tolerance on the relative size of a Newton step.
 
-    AB0 = np.array([0.0, log((prior0 + 1.0) / (prior1 + 1.0))])
-    AB_ = fmin_bfgs(objective, AB0, fprime=grad, disp=False)
-    return AB_[0], AB_[1]
+    prior : ndarray, shape (n_columns, 3), optional
+        The (aa, ab, bb) entries of the Hessian of a quadratic penalty
+        centered at the starting a and b, summarizing previously seen data.
+
+    Returns
+    -------
+    a : ndarray, shape (n_columns,)
+        The slopes.
+
+    b : ndarray, shape (n_columns,)
+        The intercepts.
+
+    hessian : ndarray, shape (n_columns, 3)
+        The (aa, ab, bb) entries of the Hessian of the loss of the samples
+        at the solution, excluding the prior.
+
+    """
+    eps = np.finfo(F.dtype).eps
+    if tol is None:
+        tol = np.sqrt(eps)
+    a = np.array(a, dtype=np.float64)
+    b = np.array(b, dtype=np.float64)
+    a0, b0 = a.copy(), b.copy()
+    if prior is None:
+        prior = np.zeros((len(a), 3))
+    pAA, pAB, pBB = prior.T
+    T1 = 1.0 - T
+    F2 = F * F
+    if sample_weight is not None and sample_weight.ndim == 1:
+        sample_weight = sample_weight[:, np.newaxis]
+    sigma = 1e-12  # keeps the Hessian positive definite (Lin et al.)
+    min_step = 1e-10
+
+    def objective(a, b):
+        # with z = a * F + b, -log(P) = log(1 + exp(z)) and
+        # -log(1 - P) = log(1 + exp(z)) - z, so the loss is
+        # log(1 + exp(z)) - (1 - T) * z; E = exp(-|z|) keeps it stable
+        z = F * a.astype(F.dtype)
+        z += b.astype(F.dtype)
+        E = np.exp(-np.abs(z))
+        loss = np.log1p(E)
+        loss += np.maximum(z, 0.0)
+        loss -= T1 * z
+        if sample_weight is not None:
+            loss *= sample_weight
+        # the quadratic penalty of the prior
+        dA, dB = a - a0, b - b0
+        penalty = 0.5 * (pAA * dA * dA + 2.0 * pAB * dA * dB + pBB * dB * dB)
+        return loss.sum(axis=0, dtype=np.float64) + penalty, z, E
+
+    def col_dot(u, v):
+        return np.einsum("ij,ij->j", u, v).astype(np.float64)
+
+    fval, z, E = objective(a, b)
+    active = np.ones(a.shape, dtype=bool)
+    for _ in range(max_iter):
+        # P = 1 / (1 + exp(z)), reusing the exponential of the objective
+        P = np.where(z > 0, E, 1.0)
+        P /= 1.0 + E
+        d = T - P  # derivative of the loss by z
+        h = P * (1.0 - P)  # second derivative of the loss by z
+        del P
+        if sample_weight is not None:
+            d *= sample_weight
+            h *= sample_weight
+        gA = col_dot(d, F) + pAA * (a - a0) + pAB * (b - b0)
+        gB = d.sum(axis=0, dtype=np.float64) + pAB * (a - a0) + pBB * (b - b0)
+        hessian = np.column_stack(
+            [col_dot(h, F2), col_dot(h, F), h.sum(axis=0, dtype=np.float64)]
+        )
+        del d, h
+        hAA = hessian[:, 0] + pAA + sigma
+        hAB = hessian[:, 1] + pAB
+        hBB = hessian[:, 2] + pBB + sigma
+        det = hAA * hBB - hAB * hAB
+        dA = -(hBB * gA - hAB * gB) / det
+        dB = -(hAA * gB - hAB * gA) / det
+        slope = gA * dA + gB * dB
+        # columns whose predicted decrease is below the rounding noise of
+        # the objective have converged
+        active &= -slope > eps * np.abs(fval)
+        if not active.any():
+            break
+        dA[~active] = 0.0
+        dB[~active] = 0.0
+        slope[~active] = 0.0
+
+        # backtracking line search, carried out for all columns at once
+        step = np.ones(a.shape)
+        pending = active.copy()
+        first_trial = True
+        while True:
+            new_fval, new_z, new_E = objective(a + step * dA, b + step * dB)
+            pending &= new_fval > fval + 1e-4 * step * slope
+            if not pending.any():
+                break
+            first_trial = False
+            step[pending] /= 2.0
+            if step.min() < min_step:
+                # no further decrease is possible at this precision
+                failed = step < min_step
+                step[failed] = 0.0
+                active[failed] = False
+                pending[failed] = False
+        a += step * dA
+        b += step * dB
+        if first_trial:
+            fval, z, E = new_fval, new_z, new_E
+        else:
+            fval, z, E = objective(a, b)
+        active &= np.maximum(np.abs(step * dA), np.abs(step * dB)) > tol * (
+            1.0 + np.maximum(np.abs(a), np.abs(b))
+        )
+        if not active.any():
+            break
+    return a, b, hessian
 
 
 class _SigmoidCalibration(BaseEstimator, RegressorMixin):
@@ -494,6 +1795,13 @@ class _SigmoidCalibration(BaseEstimator, RegressorMixin):
     b_ : float
         The intercept.
 
+    hessian_ : ndarray, shape (3,)
+        The (aa, ab, bb) entries of the Hessian of the loss of all samples
+        seen so far, used to update the model in partial_fit.
+
+    n_neg_, n_pos_ : float
+        The numbers of negative and positive samples seen so far.
+
     """
 
     def fit(self, X, y, sample_weight=None):
@@ -520,12 +1828,313 @@ class _SigmoidCalibration(BaseEstimator, RegressorMixin):
         y = column_or_1d(y)
         X, y = indexable(X, y)
 
-        self.a_, self.b_ = _sigmoid_calibration(X, y, sample_weight)
+        state = _batch_sigmoid_update(
+            X[:, np.newaxis], y[:, np.newaxis], sample_weight
+        )
+        return self._set_state(state, 0)
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """Update the model with a new batch of training data.
+
+        The previously seen data is summarized by the current parameters,
+        the Hessian of its loss and its class counts, so the update costs
+        time proportional to the new batch only.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples,)
+            Training data.
+
+        y : array-like, shape (n_samples,)
+            Training target.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        if not hasattr(self, "a_"):
+            return self.fit(X, y, sample_weight)
+        X = column_or_1d(X)
+        y = column_or_1d(y)
+        X, y = indexable(X, y)
+
+        state = _batch_sigmoid_update(
+            X[:, np.newaxis],
+            y[:, np.newaxis],
+            sample_weight,
+            state=_stack_sigmoid_states([self]),
+        )
+        return self._set_state(state, 0)
+
+    def _set_state(self, state, k):
+        """Set the fitted attributes from column k of a _SigmoidState."""
+        self.a_, self.b_ = float(state.a[k]), float(state.b[k])
+        self.hessian_ = state.hessian[k]
+        self.n_neg_, self.n_pos_ = float(state.n_neg[k]), float(state.n_pos[k])
+        return self
+
+    def predict(self, T):
+        """Predict new data by linear interpolation.
+
+        Parameters
+        ----------
+        T : array-like, shape (n_samples,)
+            Data to predict from.
+
+        Returns
+        -------
+        T_ : array, shape (n_samples,)
+            The predicted data.
+
+        """
+        T = column_or_1d(T)
+        return expit(-(self.a_ * T + self.b_))
+
+
+def _stack_sigmoid_states(calibrators):
+    """Stack the fitted states of sigmoid calibrators into a _SigmoidState."""
+    return _SigmoidState(
+        np.array([calibrator.a_ for calibrator in calibrators]),
+        np.array([calibrator.b_ for calibrator in calibrators]),
+        np.array([calibrator.hessian_ for calibrator in calibrators]),
+        np.array([calibrator.n_neg_ for calibrator in calibrators]),
+        np.array([calibrator.n_pos_ for calibrator in calibrators]),
+    )
+
+
+class _IsotonicCalibration(BaseEstimator, RegressorMixin):
+    """Isotonic regression model supporting incremental updates.
+
+    The model is fitted exactly on the samples given to fit, which are also
+    accumulated in a histogram of n_bins quantile bins of the scores,
+    holding the total weight, weighted score and weighted target of every
+    bin. partial_fit adds a new batch to the histogram, and refits the
+    isotonic regression on the weighted bin centroids, so an update costs
+    time proportional to the batch and the number of bins only, and the
+    samples need not be kept.
+
+    Parameters
+    ----------
+    n_bins : int, default 1000
+        The number of bins of the histogram.
+
+    Attributes
+    ----------
+    isotonic_ : IsotonicRegression
+        The underlying fitted isotonic regression.
+
+    bin_edges_ : ndarray, shape (n_edges,)
+        The inner edges of the histogram bins.
+
+    bin_weight_, bin_score_, bin_target_ : ndarray, shape (n_edges + 1,)
+        The total weight, weighted score sum and weighted target sum of every
+        histogram bin.
+
+    """
+
+    def __init__(self, n_bins=1000):
+        self.n_bins = n_bins
+
+    def fit(self, X, y, sample_weight=None):
+        """Fit the model using X, y as training data.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples,)
+            Training data.
+
+        y : array-like, shape (n_samples,)
+            Training target.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        X = column_or_1d(X)
+        y = column_or_1d(y)
+        self.isotonic_ = IsotonicRegression(out_of_bounds="clip")
+        self.isotonic_.fit(X, y, sample_weight)
+        edges = np.quantile(X, np.linspace(0.0, 1.0, self.n_bins + 1))
+        self.bin_edges_ = np.unique(edges[1:-1])
+        n_hist = len(self.bin_edges_) + 1
+        self.bin_weight_ = np.zeros(n_hist)
+        self.bin_score_ = np.zeros(n_hist)
+        self.bin_target_ = np.zeros(n_hist)
+        self._accumulate(X, y, sample_weight)
+        return self
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """Update the model with a new batch of training data.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples,)
+            Training data.
+
+        y : array-like, shape (n_samples,)
+            Training target.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        if not hasattr(self, "isotonic_"):
+            return self.fit(X, y, sample_weight)
+        self._accumulate(column_or_1d(X), column_or_1d(y), sample_weight)
+        nonempty = self.bin_weight_ > 0
+        weight = self.bin_weight_[nonempty]
+        self.isotonic_ = IsotonicRegression(out_of_bounds="clip")
+        self.isotonic_.fit(
+            self.bin_score_[nonempty] / weight,
+            self.bin_target_[nonempty] / weight,
+            weight,
+        )
         return self
 
+    def _accumulate(self, X, y, sample_weight=None):
+        """Add samples to the histogram."""
+        if sample_weight is None:
+            sample_weight = np.ones(X.shape[0])
+        bins = np.searchsorted(self.bin_edges_, X, side="right")
+        n_hist = len(self.bin_weight_)
+        self.bin_weight_ += np.bincount(
+            bins, weights=sample_weight, minlength=n_hist
+        )
+        self.bin_score_ += np.bincount(
+            bins, weights=sample_weight * X, minlength=n_hist
+        )
+        self.bin_target_ += np.bincount(
+            bins, weights=sample_weight * y, minlength=n_hist
+        )
+
     def predict(self, T):
         """Predict new data by linear interpolation.
 
+        Parameters
+        ----------
+        T : array-like, shape (n_samples,)
+            Data to predict from.
+
+        Returns
+        -------
+        T_ : array, shape (n_samples,)
+            The predicted data.
+
+        """
+        return self.isotonic_.predict(column_or_1d(T))
+
+
+class _LookupTableCalibration(BaseEstimator, RegressorMixin):
+    """A fitted calibrator compiled into a fixed-size lookup table.
+
+    The score range seen in fit is split into n_bins equal-width bins, and
+    each bin holds the calibrated value of its center. Predicting is then a
+    direct bin indexing and gather, with no interpolation or exp.
+
+    Parameters
+    ----------
+    calibrator : object implementing 'predict'
+        A fitted calibrator, mapping scores to calibrated probabilities.
+
+    n_bins : int, default 1024
+        The number of bins of the table.
+
+    Attributes
+    ----------
+    edges_ : ndarray of float32, shape (n_bins + 1,)
+        The bin edges.
+
+    values_ : ndarray of float32, shape (n_bins,)
+        The calibrated value of each bin.
+
+    low_ : float
+        The lowest tabulated score.
+
+    scale_ : float
+        The number of bins per unit of score.
+
+    """
+
+    def __init__(self, calibrator, n_bins=1024):
+        self.calibrator = calibrator
+        self.n_bins = n_bins
+
+    def fit(self, X, y=None):
+        """Compile the calibrator over the range of the given scores.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples,)
+            Scores spanning the range to tabulate.
+
+        y : None
+            Ignored.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        X = column_or_1d(X)
+        low, high = float(np.min(X)), float(np.max(X))
+        edges = np.linspace(low, high, self.n_bins + 1)
+        centers = (edges[:-1] + edges[1:]) / 2.0
+        self.edges_ = edges.astype(np.float32)
+        self.values_ = np.asarray(
+            self.calibrator.predict(centers), dtype=np.float32
+        )
+        self.low_ = low
+        self.scale_ = self.n_bins / (high - low) if high > low else 0.0
+        return self
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """Update the tabulated calibrator and recompile the table.
+
+        The table range is extended to cover the new scores.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples,)
+            Training data.
+
+        y : array-like, shape (n_samples,)
+            Training target.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        X = column_or_1d(X)
+        self.calibrator.partial_fit(X, y, sample_weight)
+        high = (
+            self.low_ + self.n_bins / self.scale_ if self.scale_ else self.low_
+        )
+        return self.fit([min(self.low_, X.min()), max(high, X.max())])
+
+    def predict(self, T):
+        """Predict new data by table lookup.
+
         Parameters
         ----------
         T : array-like, shape (n_samples,)
@@ -538,7 +2147,232 @@ class _SigmoidCalibration(BaseEstimator, RegressorMixin):
 
         """
         T = column_or_1d(T)
-        return 1.0 / (1.0 + np.exp(self.a_ * T + self.b_))
+        idx = (T - self.low_) * self.scale_
+        np.clip(idx, 0, self.n_bins - 1, out=idx)
+        return self.values_[idx.astype(np.intp)]
+
+
+_SOFTMAX_METHODS = ("temperature", "vector")
+
+
+def _class_indicators(Y):
+    """Return the one-hot matrix of all classes of a label_binarize output."""
+    if Y.shape[1] == 1:
+        return np.hstack([1 - Y, Y])
+    return Y
+
+
+class _SoftmaxCalibration(BaseEstimator, RegressorMixin):
+    """Temperature or vector scaling of a matrix of logits.
+
+    The calibrated probabilities are ``softmax(X * coef_ + intercept_)``,
+    row-wise, and all parameters are fitted in one solve, minimizing the
+    cross-entropy with L-BFGS and an analytic gradient.
+
+    Parameters
+    ----------
+    vector : bool, default False
+        If False, a single scalar coef_ (the inverse temperature) is
+        fitted, and intercept_ is zero. If True, a weight and a bias are
+        fitted per column.
+
+    Attributes
+    ----------
+    coef_ : float or ndarray, shape (n_columns,)
+        The weights of the logits.
+
+    intercept_ : ndarray, shape (n_columns,)
+        The biases of the logits.
+
+    hessian_ : ndarray
+        The diagonal of the Hessian of the loss of all samples seen so far,
+        with respect to coef_ and the fitted intercept_, used to update the
+        model in partial_fit.
+
+    """
+
+    def __init__(self, vector=False):
+        self.vector = vector
+
+    def fit(self, X, y, sample_weight=None):
+        """Fit the model using X, y as training data.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_columns)
+            The logits.
+
+        y : array-like, shape (n_samples, n_columns)
+            The one-hot encoded training target. Rows with no positive
+            column are ignored.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        n_columns = np.shape(X)[1]
+        theta = np.ones(2 * n_columns if self.vector else 1)
+        if self.vector:
+            theta[n_columns:] = 0.0
+        return self._fit(X, y, sample_weight, theta, None)
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """Update the model with a new batch of training data.
+
+        As for the sigmoid calibration, the previously seen data is
+        summarized by the current parameters and the (diagonal) Hessian of
+        its loss, which acts as a quadratic prior on the update.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_columns)
+            The logits.
+
+        y : array-like, shape (n_samples, n_columns)
+            The one-hot encoded training target.
+
+        sample_weight : array-like, shape = [n_samples] or None
+            Sample weights. If None, then samples are equally weighted.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        if not hasattr(self, "coef_"):
+            return self.fit(X, y, sample_weight)
+        return self._fit(
+            X, y, sample_weight, self._theta(), (self._theta(), self.hessian_)
+        )
+
+    def _theta(self):
+        """Return the fitted parameters as a single vector."""
+        if self.vector:
+            return np.concatenate([self.coef_, self.intercept_])
+        return np.array([self.coef_])
+
+    def _fit(self, X, y, sample_weight, theta, prior):
+        """Minimize the cross-entropy, plus a quadratic prior if given."""
+        X = np.asarray(X, dtype=np.float64)
+        Y = np.asarray(y, dtype=np.float64)
+        # rows of classes unknown to the logits carry no information
+        labeled = Y.any(axis=1)
+        if sample_weight is None:
+            sample_weight = np.ones(X.shape[0])
+        else:
+            sample_weight = np.asarray(sample_weight, dtype=np.float64)
+        if not labeled.all():
+            X, Y = X[labeled], Y[labeled]
+            sample_weight = sample_weight[labeled]
+        n_columns = X.shape[1]
+
+        def softmax(theta):
+            """Return the probabilities and the loss of every row."""
+            Z = X * (theta[:n_columns] if self.vector else theta[0])
+            if self.vector:
+                Z += theta[n_columns:]
+            Z -= Z.max(axis=1)[:, np.newaxis]
+            target = np.einsum("ij,ij->i", Y, Z)
+            np.exp(Z, out=Z)
+            norm = Z.sum(axis=1)
+            Z /= norm[:, np.newaxis]
+            return Z, np.log(norm) - target
+
+        def objective(theta):
+            P, loss = softmax(theta)
+            loss = np.dot(sample_weight, loss)
+            P -= Y
+            P *= sample_weight[:, np.newaxis]
+            if self.vector:
+                grad = np.concatenate(
+                    [np.einsum("ij,ij->j", P, X), P.sum(axis=0)]
+                )
+            else:
+                grad = np.array([np.einsum("ij,ij->", P, X)])
+            if prior is not None:
+                theta_0, hessian = prior
+                step = theta - theta_0
+                loss += 0.5 * np.dot(hessian * step, step)
+                grad += hessian * step
+            return loss, grad
+
+        def diagonal_hessian(P):
+            """Return the diagonal of the Hessian of the loss at P."""
+            if self.vector:
+                variance = P * (1.0 - P)
+                return np.concatenate(
+                    [
+                        sample_weight @ (variance * X * X),
+                        sample_weight @ variance,
+                    ]
+                )
+            mean = np.einsum("ij,ij->i", P, X)
+            second = np.einsum("ij,ij,ij->i", P, X, X)
+            return np.array([sample_weight @ (second - mean * mean)])
+
+        # precondition the vector scaling by its initial diagonal Hessian,
+        # which cuts L-BFGS iterations manyfold when the columns of X differ
+        # in scale; a lone temperature needs no preconditioning
+        scale = np.ones_like(theta)
+        if self.vector:
+            hessian = diagonal_hessian(softmax(theta)[0])
+            if prior is not None:
+                hessian += prior[1]
+            scale /= np.sqrt(np.maximum(hessian, 1e-12))
+        theta_start = theta
+
+        def scaled_objective(u):
+            loss, grad = objective(theta_start + scale * u)
+            return loss, grad * scale
+
+        u = minimize(
+            scaled_objective,
+            np.zeros_like(theta),
+            jac=True,
+            method="L-BFGS-B",
+        ).x
+        theta = theta_start + scale * u
+        # the diagonal of the Hessian of the loss at the optimum
+        hessian = diagonal_hessian(softmax(theta)[0])
+        if prior is not None:
+            hessian += prior[1]
+
+        if self.vector:
+            self.coef_ = theta[:n_columns]
+            self.intercept_ = theta[n_columns:]
+        else:
+            self.coef_ = float(theta[0])
+            self.intercept_ = np.zeros(n_columns)
+        self.hessian_ = hessian
+        return self
+
+    def predict(self, T):
+        """Predict the calibrated probabilities of a matrix of logits.
+
+        Parameters
+        ----------
+        T : array-like, shape (n_samples, n_columns)
+            The logits to predict from.
+
+        Returns
+        -------
+        T_ : array, shape (n_samples, n_columns)
+            The calibrated probabilities, summing to one along each row, of
+            the floating point type of T.
+
+        """
+        Z = np.multiply(T, self.coef_, dtype=np.result_type(T, np.float32))
+        Z += self.intercept_
+        Z -= Z.max(axis=1)[:, np.newaxis]
+        np.exp(Z, out=Z)
+        Z /= Z.sum(axis=1)[:, np.newaxis]
+        return Z
 
 
 def _check_binary_probabilistic_predictions(y_true, y_prob):
@@ -559,7 +2393,7 @@ def _check_binary_probabilistic_predictions(y_true, y_prob):
     if y_prob.min() < 0:
         raise ValueError("y_prob contains values less than 0.")
 
-    return label_binarize(y_true, labels)[:, 0]
+    return label_binarize(y_true, classes=labels)[:, 0]
 
 
 def calibration_curve(y_true, y_prob, normalize=False, n_bins=5):
@@ -613,15 +2447,179 @@ def calibration_curve(y_true, y_prob, normalize=False, n_bins=5):
 
     y_true = _check_binary_probabilistic_predictions(y_true, y_prob)
 
-    bins = np.linspace(0.0, 1.0 + 1e-8, n_bins + 1)
-    binids = np.digitize(y_prob, bins) - 1
+    accumulator = CalibrationCurveAccumulator(n_bins=n_bins)
+    return accumulator.update(y_true, y_prob).result()
+
+
+class CalibrationCurveAccumulator(object):
+    """Streaming, mergeable accumulator of calibration curves.
+
+    Only the per-bin counts, sums of predicted probabilities and sums of
+    true targets are kept, so arbitrarily many predictions can be processed
+    in chunks, possibly by different workers whose accumulators are then
+    merged. The curves are computed exactly as by calibration_curve.
+
+    Parameters
+    ----------
+    n_bins : int, default 5
+        Number of bins. A bigger number requires more data.
+
+    pos_label : int or str, default 1
+        The label of the positive class, when updating with the
+        probabilities of the positive class only.
+
+    classes : array-like, shape (n_classes,), optional
+        The class labels of the columns of a multiclass y_prob matrix. By
+        default, the labels are the column indices.
+
+    Attributes
+    ----------
+    bin_total_ : ndarray, shape (n_curves, n_bins)
+        The number of predictions in each bin.
+
+    bin_sums_ : ndarray, shape (n_curves, n_bins)
+        The sum of predicted probabilities in each bin.
+
+    bin_true_ : ndarray, shape (n_curves, n_bins)
+        The number of positive targets in each bin.
+
+    Example
+    -------
+    >>> acc = CalibrationCurveAccumulator(n_bins=2)
+    >>> acc = acc.update([0, 1], [0.1, 0.8]).update([1, 1], [0.3, 0.9])
+    >>> prob_true, prob_pred = acc.result()
+    >>> prob_true
+    array([0.5, 1. ])
+
+    """
+
+    def __init__(self, n_bins=5, pos_label=1, classes=None):
+        """Initialize the accumulator."""
+        self.n_bins = n_bins
+        self.pos_label = pos_label
+        self.classes = classes
+
+    def update(self, y_true, y_prob):
+        """Add a chunk of predictions.
 
-    bin_sums = np.bincount(binids, weights=y_prob, minlength=len(bins))
-    bin_true = np.bincount(binids, weights=y_true, minlength=len(bins))
-    bin_total = np.bincount(binids, minlength=len(bins))
+        Parameters
+        ----------
+        y_true : array, shape (n_samples,)
+            True targets.
 
-    nonzero = bin_total != 0
-    prob_true = bin_true[nonzero] / bin_total[nonzero]
-    prob_pred = bin_sums[nonzero] / bin_total[nonzero]
+        y_prob : array, shape (n_samples,) or (n_samples, n_classes)
+            Probabilities of the positive class, or of every class. All
+            chunks must have the same number of dimensions and columns.
 
-    return prob_true, prob_pred
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        y_true = column_or_1d(y_true)
+        y_prob = np.asarray(y_prob, dtype=np.float64)
+        check_consistent_length(y_true, y_prob)
+        if y_prob.size and (y_prob.min() < 0 or y_prob.max() > 1):
+            raise ValueError("y_prob has values outside [0, 1].")
+        if y_prob.ndim == 1:
+            y_prob = y_prob[:, np.newaxis]
+            y_bin = (y_true == self.pos_label)[:, np.newaxis]
+            binary = True
+        else:
+            classes = self.classes
+            if classes is None:
+                classes = np.arange(y_prob.shape[1])
+            y_bin = y_true[:, np.newaxis] == np.asarray(classes)
+            binary = False
+        n_curves = y_prob.shape[1]
+        if not hasattr(self, "bin_total_"):
+            self._binary = binary
+            shape = (n_curves, self.n_bins)
+            self.bin_total_ = np.zeros(shape, dtype=np.int64)
+            self.bin_sums_ = np.zeros(shape)
+            self.bin_true_ = np.zeros(shape)
+        elif binary != self._binary or n_curves != len(self.bin_total_):
+            raise ValueError(
+                "y_prob should have the same shape in all chunks."
+            )
+
+        # one bincount over the bins of all curves at once
+        bins = np.linspace(0.0, 1.0 + 1e-8, self.n_bins + 1)
+        binids = np.digitize(y_prob, bins) - 1
+        binids += self.n_bins * np.arange(n_curves)
+        binids = binids.ravel()
+        size = n_curves * self.n_bins
+        shape = self.bin_total_.shape
+        self.bin_total_ += np.bincount(binids, minlength=size).reshape(shape)
+        self.bin_sums_ += np.bincount(
+            binids, weights=y_prob.ravel(), minlength=size
+        ).reshape(shape)
+        self.bin_true_ += np.bincount(
+            binids, weights=y_bin.ravel(), minlength=size
+        ).reshape(shape)
+        return self
+
+    def merge(self, other):
+        """Add the predictions accumulated by another accumulator.
+
+        Parameters
+        ----------
+        other : CalibrationCurveAccumulator
+            An accumulator with the same number of bins, updated with
+            predictions of the same shape.
+
+        Returns
+        -------
+        self : object
+            Returns an instance of self.
+
+        """
+        if not hasattr(other, "bin_total_"):
+            return self
+        if not hasattr(self, "bin_total_"):
+            self._binary = other._binary
+            self.bin_total_ = other.bin_total_.copy()
+            self.bin_sums_ = other.bin_sums_.copy()
+            self.bin_true_ = other.bin_true_.copy()
+            return self
+        if self._binary != other._binary or (
+            self.bin_total_.shape != other.bin_total_.shape
+        ):
+            raise ValueError(
+                "Cannot merge accumulators of different shapes: %s and %s."
+                % (self.bin_total_.shape, other.bin_total_.shape)
+            )
+        self.bin_total_ += other.bin_total_
+        self.bin_sums_ += other.bin_sums_
+        self.bin_true_ += other.bin_true_
+        return self
+
+    def result(self):
+        """Compute the calibration curves of all accumulated predictions.
+
+        Returns
+        -------
+        prob_true : array, shape (n_nonempty_bins,)
+            The true probability in each bin (fraction of positives). Given
+            as a list holding an array per class if updated with multiclass
+            probabilities.
+
+        prob_pred : array, shape (n_nonempty_bins,)
+            The mean predicted probability in each bin. Given as a list
+            holding an array per class if updated with multiclass
+            probabilities.
+
+        """
+        if not hasattr(self, "bin_total_"):
+            raise ValueError("No predictions were accumulated.")
+        prob_true, prob_pred = [], []
+        for total, sums, true in zip(
+            self.bin_total_, self.bin_sums_, self.bin_true_
+        ):
+            nonzero = total != 0
+            prob_true.append(true[nonzero] / total[nonzero])
+            prob_pred.append(sums[nonzero] / total[nonzero])
+        if self._binary:
+            return prob_true[0], prob_pred[0]
+        return prob_true, prob_pred
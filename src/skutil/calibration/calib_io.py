@@ -0,0 +1,358 @@
+"""Compact, memory-mappable export of fitted calibrated classifiers."""
+
+import json
+import os
+import pickle
+import warnings
+
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils.validation import check_is_fitted
+
+from .calib_clf import CalibratingCvClassifier
+from .calib_clf_cv import (
+    _SOFTMAX_METHODS,
+    UnsafeCalibratedClassifierCV,
+    _CalibratedClassifier,
+    _LookupTableCalibration,
+    _SigmoidCalibration,
+    _SoftmaxCalibration,
+)
+
+_FORMAT_VERSION = 1
+_META_FILE = "meta.json"
+_ESTIMATORS_FILE = "estimators.pkl"
+
+
+class _InterpolationCalibration(object):
+    """A loaded isotonic calibrator, interpolating between its knots.
+
+    Parameters
+    ----------
+    X_thresholds : ndarray, shape (n_knots,)
+        The increasing scores of the knots.
+
+    y_thresholds : ndarray, shape (n_knots,)
+        The calibrated values of the knots.
+
+    """
+
+    def __init__(self, X_thresholds, y_thresholds):
+        self.X_thresholds = X_thresholds
+        self.y_thresholds = y_thresholds
+
+    def predict(self, T):
+        """Predict new data by linear interpolation, clipping outside."""
+        return np.interp(T, self.X_thresholds, self.y_thresholds)
+
+
+def _json_params(estimator, exclude):
+    """Return the JSON serializable parameters of an estimator.
+
+    The dtype parameter is stored by the name of its numpy type. Other
+    parameters that JSON cannot encode are dropped with a warning.
+    """
+    params = {}
+    dropped = []
+    for name, value in estimator.get_params(deep=False).items():
+        if name in exclude:
+            continue
+        if name == "dtype":
+            value = np.dtype(value).name
+        try:
+            json.dumps(value)
+        except TypeError:
+            dropped.append(name)
+            continue
+        params[name] = value
+    if dropped:
+        warnings.warn(
+            "The parameters %s of %s cannot be exported, and will be reset "
+            "to their defaults on loading. They do not change predictions."
+            % (", ".join(dropped), type(estimator).__name__),
+            UserWarning,
+            stacklevel=3,
+        )
+    return params
+
+
+def _isotonic_knots(calibrator):
+    """Return the knots of a fitted or loaded isotonic calibrator."""
+    if isinstance(calibrator, _InterpolationCalibration):
+        return calibrator.X_thresholds, calibrator.y_thresholds
+    isotonic = calibrator.isotonic_
+    return isotonic.X_thresholds_, isotonic.y_thresholds_
+
+
+def _mapped_files(calibrated):
+    """Return the files the arrays of a calibrated model are mapped from."""
+    arrays = [calibrated.classes_]
+    for calibrated_classifier in calibrated.calibrated_classifiers_:
+        arrays.append(calibrated_classifier.classes_)
+        for calibrator in calibrated_classifier.calibrators_:
+            arrays.extend(vars(calibrator).values())
+    files = set()
+    for array in arrays:
+        while isinstance(array, np.ndarray):
+            if isinstance(array, np.memmap) and array.filename:
+                files.add(array.filename)
+                break
+            array = array.base
+    return files
+
+
+def _save_array(path, array):
+    """Save an array into a new file, then move it over path.
+
+    Replacing the file, rather than overwriting it, keeps the memory maps
+    of the previous file by other processes valid on POSIX systems.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as array_file:
+        np.save(array_file, array)
+    os.replace(tmp_path, path)
+
+
+def _calibrator_arrays(calibrated_classifiers, method, lookup_bins):
+    """Flatten the calibrators of all calibrated classifiers into arrays."""
+    calibrators = [
+        calibrator
+        for calibrated_classifier in calibrated_classifiers
+        for calibrator in calibrated_classifier.calibrators_
+    ]
+    arrays = {
+        "calibrator_offsets": np.cumsum(
+            [0]
+            + [
+                len(calibrated_classifier.calibrators_)
+                for calibrated_classifier in calibrated_classifiers
+            ]
+        ),
+    }
+    if method in _SOFTMAX_METHODS:
+        arrays["softmax_offsets"] = np.cumsum(
+            [0] + [len(c.intercept_) for c in calibrators]
+        )
+        arrays["softmax_coef"] = np.hstack([c.coef_ for c in calibrators])
+        arrays["softmax_intercept"] = np.concatenate(
+            [c.intercept_ for c in calibrators]
+        )
+    elif lookup_bins:
+        arrays["lookup_low"] = np.array([c.low_ for c in calibrators])
+        arrays["lookup_scale"] = np.array([c.scale_ for c in calibrators])
+        arrays["lookup_values"] = np.array(
+            [c.values_ for c in calibrators], dtype=np.float32
+        ).reshape(len(calibrators), lookup_bins)
+    elif method == "sigmoid":
+        arrays["sigmoid_a"] = np.array([c.a_ for c in calibrators])
+        arrays["sigmoid_b"] = np.array([c.b_ for c in calibrators])
+    elif method == "isotonic":
+        knots = [_isotonic_knots(c) for c in calibrators]
+        arrays["isotonic_offsets"] = np.cumsum(
+            [0] + [len(x_knots) for x_knots, _ in knots]
+        )
+        arrays["isotonic_x"] = np.concatenate(
+            [x_knots for x_knots, _ in knots]
+        )
+        arrays["isotonic_y"] = np.concatenate(
+            [y_knots for _, y_knots in knots]
+        )
+    else:
+        raise ValueError("Cannot export calibration method %s." % method)
+    return arrays
+
+
+def _load_calibrators(arrays, method, lookup_bins):
+    """Rebuild the flat list of calibrators from their arrays."""
+    n_calibrators = int(arrays["calibrator_offsets"][-1])
+    calibrators = []
+    for k in range(n_calibrators):
+        if method in _SOFTMAX_METHODS:
+            calibrator = _SoftmaxCalibration(vector=method == "vector")
+            start, stop = arrays["softmax_offsets"][k : k + 2]
+            calibrator.intercept_ = arrays["softmax_intercept"][start:stop]
+            if calibrator.vector:
+                calibrator.coef_ = arrays["softmax_coef"][start:stop]
+            else:
+                calibrator.coef_ = float(arrays["softmax_coef"][k])
+        elif lookup_bins:
+            calibrator = _LookupTableCalibration(None, lookup_bins)
+            calibrator.low_ = float(arrays["lookup_low"][k])
+            calibrator.scale_ = float(arrays["lookup_scale"][k])
+            calibrator.values_ = arrays["lookup_values"][k]
+        elif method == "sigmoid":
+            calibrator = _SigmoidCalibration()
+            calibrator.a_ = float(arrays["sigmoid_a"][k])
+            calibrator.b_ = float(arrays["sigmoid_b"][k])
+        else:
+            start, stop = arrays["isotonic_offsets"][k : k + 2]
+            calibrator = _InterpolationCalibration(
+                arrays["isotonic_x"][start:stop],
+                arrays["isotonic_y"][start:stop],
+            )
+        calibrators.append(calibrator)
+    return calibrators
+
+
+def dump_calibrated(model, path):
+    """Export a fitted calibrated classifier into a directory.
+
+    All calibrators are stored as a few flat numpy arrays, one ``.npy`` file
+    each, next to a small JSON file of parameters and a pickle of the base
+    estimators. Loading such a directory with load_calibrated
+    memory-maps the arrays, so that scoring processes loading the same
+    export share their pages, and is much faster than unpickling the model.
+    Models loaded with load_calibrated can be exported again, but only
+    into the directory they were loaded from if they were loaded with
+    mmap_mode=None, as their files cannot be replaced while mapped on some
+    platforms. Parameters that JSON cannot encode, such as a
+    cross-validation splitter object, are not exported, with a warning.
+
+    Parameters
+    ----------
+    model : UnsafeCalibratedClassifierCV or CalibratingCvClassifier
+        The fitted model to export.
+
+    path : str
+        The directory to export the model into. It is created if needed,
+        and existing export files in it are overwritten.
+
+    """
+    if isinstance(model, CalibratingCvClassifier):
+        check_is_fitted(model, "_calib")
+        calibrated = model._calib
+        params = _json_params(model, exclude=("clf",))
+    elif isinstance(model, UnsafeCalibratedClassifierCV):
+        calibrated = model
+        params = _json_params(model, exclude=("base_estimator",))
+    else:
+        raise TypeError(
+            "Can only export UnsafeCalibratedClassifierCV or "
+            "CalibratingCvClassifier models. Got %s." % type(model).__name__
+        )
+    check_is_fitted(calibrated, ["classes_", "calibrated_classifiers_"])
+    classes = np.asarray(calibrated.classes_)
+    if classes.dtype == object:
+        raise ValueError(
+            "Cannot export models with classes of object dtype, as they "
+            "cannot be memory-mapped. Use numeric or string class labels."
+        )
+    real_path = os.path.realpath(path)
+    if any(
+        os.path.dirname(os.path.realpath(mapped)) == real_path
+        for mapped in _mapped_files(calibrated)
+    ):
+        raise ValueError(
+            "Cannot export a model into the directory %s it is memory-mapped "
+            "from. Load it with mmap_mode=None to export it in place." % path
+        )
+    calibrated_classifiers = calibrated.calibrated_classifiers_
+    arrays = _calibrator_arrays(
+        calibrated_classifiers, calibrated.method, calibrated.lookup_bins
+    )
+    arrays["classes"] = classes
+
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        _save_array(os.path.join(path, name + ".npy"), array)
+    with open(os.path.join(path, _ESTIMATORS_FILE), "wb") as pickle_file:
+        pickle.dump(
+            [cc.base_estimator for cc in calibrated_classifiers],
+            pickle_file,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    meta = {
+        "format_version": _FORMAT_VERSION,
+        "model": type(model).__name__,
+        "params": params,
+        "method": calibrated.method,
+        "lookup_bins": calibrated.lookup_bins,
+        "arrays": sorted(arrays),
+    }
+    with open(os.path.join(path, _META_FILE), "w") as meta_file:
+        json.dump(meta, meta_file, indent=2)
+
+
+def load_calibrated(path, mmap_mode="r"):
+    """Load a calibrated classifier exported with dump_calibrated.
+
+    The loaded model predicts exactly as the exported one. It is meant for
+    scoring only: its calibration cannot be updated with
+    recalibrate_partial, and parameters that could not be exported, such
+    as a cross-validation splitter object, are reset to their defaults.
+    As the base estimators are unpickled, only load trusted exports.
+
+    Parameters
+    ----------
+    path : str
+        The directory the model was exported into.
+
+    mmap_mode : {None, 'r', 'c'}, default 'r'
+        How to memory-map the arrays of the calibrators; see numpy.load.
+        With 'r', processes loading the same export share the memory of
+        these arrays. If None, they are read into memory.
+
+    Returns
+    -------
+    model : UnsafeCalibratedClassifierCV or CalibratingCvClassifier
+        The loaded model.
+
+    """
+    with open(os.path.join(path, _META_FILE)) as meta_file:
+        meta = json.load(meta_file)
+    if meta["format_version"] > _FORMAT_VERSION:
+        raise ValueError(
+            "Unsupported export format version %d." % meta["format_version"]
+        )
+    arrays = {
+        name: np.load(
+            os.path.join(path, name + ".npy"),
+            mmap_mode=mmap_mode,
+            allow_pickle=False,
+        )
+        for name in meta["arrays"]
+    }
+    with open(os.path.join(path, _ESTIMATORS_FILE), "rb") as pickle_file:
+        estimators = pickle.load(pickle_file)  # noqa: S301
+    method, lookup_bins = meta["method"], meta["lookup_bins"]
+    calibrators = _load_calibrators(arrays, method, lookup_bins)
+    offsets = arrays["calibrator_offsets"]
+    classes = arrays["classes"]
+    # the classes are already unique and sorted, so all folds share a
+    # label encoder that needs no fitting
+    label_encoder = LabelEncoder()
+    label_encoder.classes_ = classes
+    dtype = np.dtype(meta["params"].get("dtype", "float64"))
+    meta["params"]["dtype"] = dtype.type
+
+    calibrated_classifiers = []
+    for k, estimator in enumerate(estimators):
+        calibrated_classifier = _CalibratedClassifier(
+            estimator,
+            method=method,
+            classes=classes,
+            lookup_bins=lookup_bins,
+            dtype=dtype.type,
+        )
+        calibrated_classifier.label_encoder_ = label_encoder
+        calibrated_classifier.classes_ = classes
+        calibrated_classifier.calibrators_ = calibrators[
+            offsets[k] : offsets[k + 1]
+        ]
+        calibrated_classifiers.append(calibrated_classifier)
+
+    if meta["model"] == CalibratingCvClassifier.__name__:
+        model = CalibratingCvClassifier(estimators[0], **meta["params"])
+        model._calib = UnsafeCalibratedClassifierCV(
+            base_estimator=estimators[0],
+            method=method,
+            cv="prefit",
+            batch_size=model.batch_size,
+            dtype=model.dtype,
+        )
+        calibrated = model._calib
+    else:
+        model = calibrated = UnsafeCalibratedClassifierCV(**meta["params"])
+    calibrated.classes_ = classes
+    calibrated.calibrated_classifiers_ = calibrated_classifiers
+    return model
@@ -1,3 +1,10 @@
-from .search import ConstrainedParameterGrid
+from .cached_search import CachedGridSearch
+from .halving_search import HalvingGridSearch
+from .search import ConstrainedParameterGrid, ConstrainedParameterSampler
 
-__all__ = ["ConstrainedParameterGrid"]
+__all__ = [
+    "CachedGridSearch",
+    "ConstrainedParameterGrid",
+    "ConstrainedParameterSampler",
+    "HalvingGridSearch",
+]
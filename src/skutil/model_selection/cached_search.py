@@ -0,0 +1,291 @@
+"""Resumable hyper-parameter search with an on-disk cache of results."""
+
+import json
+import numbers
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from joblib import hash as joblib_hash
+from sklearn.model_selection import check_cv, cross_val_score
+
+from ..estimators import classifier_by_params
+
+# the fields of a cache record that results are read from
+_RECORD_FIELDS = frozenset(("test_scores", "fit_time"))
+
+
+def _json_safe(params):
+    """Return params with values that JSON cannot encode replaced by reprs."""
+    safe = {}
+    for key, value in params.items():
+        try:
+            json.dumps(value)
+        except TypeError:
+            value = repr(value)
+        safe[key] = value
+    return safe
+
+
+def _read_cache(path):
+    """Return the cached records of a cache file, by key.
+
+    Lines that are not complete records, like a last line left incomplete
+    by an interrupted write, are ignored.
+    """
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path) as cache_file:
+        for line in cache_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if (
+                isinstance(record, dict)
+                and isinstance(record.get("key"), str)
+                and _RECORD_FIELDS.issubset(record)
+            ):
+                records[record["key"]] = record
+    return records
+
+
+def _ends_line(path):
+    """Whether a file is missing, empty or ends with a newline."""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return True
+    with open(path, "rb") as cache_file:
+        cache_file.seek(-1, os.SEEK_END)
+        return cache_file.read(1) == b"\n"
+
+
+def _scoring_spec(scoring):
+    """Return a description of a scoring that is the same in every process."""
+    if scoring is None or isinstance(scoring, str):
+        return repr(scoring)
+    qualname = getattr(scoring, "__qualname__", None)
+    if qualname is not None and "<" not in qualname:
+        # functions are keyed by name, as their repr holds their address
+        return "{}.{}".format(scoring.__module__, qualname)
+    spec = repr(scoring)
+    if qualname is not None or " at 0x" in spec:
+        raise ValueError(
+            "The scoring {} cannot key cached results, as it has no stable "
+            "name. Use a module-level function or a scorer from "
+            "sklearn.metrics.make_scorer.".format(spec)
+        )
+    return spec
+
+
+def _check_deterministic(cv):
+    """Raise if a splitter may split differently in every run."""
+    random_state = getattr(cv, "random_state", 0)
+    if getattr(cv, "shuffle", True) and not isinstance(
+        random_state, numbers.Integral
+    ):
+        raise ValueError(
+            "The cross-validation splitter {!r} shuffles with a random state "
+            "that is not an int, so its splits change between runs and "
+            "cannot key cached results. Set random_state to an "
+            "int.".format(cv)
+        )
+
+
+def _evaluate(key, estimator_name, params, X, y, cv, scoring):
+    """Cross-validate the classifier of the given name and parameters."""
+    estimator = classifier_by_params(estimator_name, **params)
+    start = time.perf_counter()
+    scores = cross_val_score(estimator, X, y, cv=cv, scoring=scoring)
+    return key, {
+        "test_scores": [float(score) for score in scores],
+        "fit_time": time.perf_counter() - start,
+    }
+
+
+class CachedGridSearch(object):
+    """Cross-validated search over a constrained grid, caching every result.
+
+    The points of the grid are evaluated in a process pool, and the result
+    of every point is appended to a JSON lines cache file as soon as it is
+    available. Results are keyed by a hash of the parameters, the estimator
+    name, a fingerprint of the dataset and the cross-validation and scoring
+    specifications, so that a search that was interrupted, or that is
+    re-run after widening the grid or restricting it with partial, only
+    evaluates the points missing from the cache.
+
+    Parameters
+    ----------
+    estimator_name : str
+        The name of the classifier to build with classifier_by_params for
+        every point of the grid.
+    grid : ConstrainedParameterGrid
+        The grid of parameters to search.
+    cache_path : str
+        The path of the cache file. It is created if needed, and is only
+        ever appended to.
+    cv : int, cross-validation generator or an iterable, default 5
+        Determines the cross-validation splitting strategy, as in
+        sklearn.model_selection.cross_val_score. A splitter object must
+        have a deterministic repr, which keys its results, so a shuffling
+        one must have an int random_state; iterables of splits are keyed
+        by their contents.
+    scoring : str, callable or None, optional
+        The scoring of the folds, as in cross_val_score. By default, the
+        score method of the classifier. A function is keyed by its
+        qualified name, and other callables by their repr, which must not
+        hold a memory address.
+    n_jobs : int, optional
+        The number of worker processes. None means 1 unless in a
+        :obj:`joblib.parallel_backend` context. -1 means using all
+        processors.
+    fingerprint : str, optional
+        A fingerprint of the dataset, for keying the results. By default, a
+        hash of X and y, which costs a pass over the data.
+
+    Attributes
+    ----------
+    results_ : list of dicts
+        The results of all points of the grid, in grid order, with keys
+        'params', 'test_scores', 'mean_test_score', 'fit_time' and
+        'cached', whether the result was read from the cache.
+    best_params_ : dict
+        The parameters of the point with the highest mean test score.
+    best_score_ : float
+        The highest mean test score.
+    n_evaluated_ : int
+        The number of points evaluated by the last call to fit, the others
+        being read from the cache.
+
+    Example
+    -------
+    >>> from sklearn.datasets import make_classification
+    >>> from skutil.model_selection import ConstrainedParameterGrid
+    >>> X, y = make_classification(random_state=0)
+    >>> grid = ConstrainedParameterGrid({'C': [0.1, 1.0], 'max_iter': [200]})
+    >>> search = CachedGridSearch('lr', grid, 'cache.jsonl')  # doctest: +SKIP
+    >>> search.fit(X, y).n_evaluated_  # doctest: +SKIP
+    2
+    >>> search.fit(X, y).n_evaluated_  # doctest: +SKIP
+    0
+
+    """
+
+    def __init__(
+        self,
+        estimator_name,
+        grid,
+        cache_path,
+        cv=5,
+        scoring=None,
+        n_jobs=None,
+        fingerprint=None,
+    ):
+        """Initialize the cached grid search."""
+        self.estimator_name = estimator_name
+        self.grid = grid
+        self.cache_path = cache_path
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.fingerprint = fingerprint
+
+    def _search_key(self, X, y, cv):
+        """Return the hash of everything but the parameters keying a result."""
+        fingerprint = self.fingerprint
+        if fingerprint is None:
+            fingerprint = joblib_hash((X, y))
+        if (
+            self.cv is None
+            or hasattr(self.cv, "split")
+            or isinstance(self.cv, numbers.Integral)
+        ):
+            _check_deterministic(cv)
+            cv_spec = repr(cv)
+        else:
+            # an iterable of splits is keyed by its contents
+            cv_spec = joblib_hash(list(cv.split(X, y)))
+        return joblib_hash(
+            (
+                self.estimator_name,
+                fingerprint,
+                cv_spec,
+                _scoring_spec(self.scoring),
+            )
+        )
+
+    def fit(self, X, y):
+        """Evaluate all the points of the grid missing from the cache.
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_features)
+            The training input samples.
+        y : array-like, shape (n_samples,)
+            The target values.
+
+        Returns
+        -------
+        self : object
+            Returns self.
+
+        """
+        cv = check_cv(self.cv, y, classifier=True)
+        search_key = self._search_key(X, y, cv)
+        records = _read_cache(self.cache_path)
+        keyed = [
+            (joblib_hash((search_key, params)), params) for params in self.grid
+        ]
+        missing = {}
+        for key, params in keyed:
+            if key not in records:
+                missing.setdefault(key, params)
+
+        # results are written in the order they finish
+        results = Parallel(
+            n_jobs=self.n_jobs, return_as="generator_unordered"
+        )(
+            delayed(_evaluate)(
+                key, self.estimator_name, params, X, y, cv, self.scoring
+            )
+            for key, params in missing.items()
+        )
+        ends_line = _ends_line(self.cache_path)
+        with open(self.cache_path, "a") as cache_file:
+            if not ends_line:
+                # end the line an interrupted write left incomplete
+                cache_file.write("\n")
+            for key, result in results:
+                record = dict(
+                    key=key,
+                    estimator=self.estimator_name,
+                    params=_json_safe(missing[key]),
+                    **result,
+                )
+                # a line per result, flushed so that it survives a crash
+                cache_file.write(json.dumps(record) + "\n")
+                cache_file.flush()
+                records[key] = record
+        self.n_evaluated_ = len(missing)
+
+        self.results_ = [
+            {
+                "params": params,
+                "test_scores": records[key]["test_scores"],
+                "mean_test_score": float(np.mean(records[key]["test_scores"])),
+                "fit_time": records[key]["fit_time"],
+                "cached": key not in missing,
+            }
+            for key, params in keyed
+        ]
+        if self.results_:
+            best = max(
+                self.results_,
+                key=lambda result: np.nan_to_num(
+                    result["mean_test_score"], nan=-np.inf
+                ),
+            )
+            self.best_params_ = best["params"]
+            self.best_score_ = best["mean_test_score"]
+        return self
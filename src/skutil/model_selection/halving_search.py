@@ -0,0 +1,303 @@
+"""Successive-halving hyper-parameter search over a constrained grid."""
+
+import math
+import numbers
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.sparse import issparse
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import check_cv
+from sklearn.utils import check_random_state, indexable
+
+from .._utils import _rows
+from ..estimators import classifier_by_params
+
+# Resources that warm-started estimators count in total rather than per
+# call to fit; every other resource is given as the increment of a call.
+_CUMULATIVE_RESOURCES = ("n_estimators",)
+
+
+def _fit_and_score(estimator, X, y, train, test, scorer):
+    """Fit an estimator on a fold and return it with its test score."""
+    estimator.fit(_rows(X, train), _rows(y, train))
+    return estimator, scorer(estimator, _rows(X, test), _rows(y, test))
+
+
+def _order_key(mean_score):
+    """Return a sort key ranking NaN mean scores last."""
+    return -np.nan_to_num(mean_score, nan=-np.inf)
+
+
+class HalvingGridSearch(object):
+    """Successive-halving search over the valid points of a constrained grid.
+
+    All the valid points of the grid are cross-validated on a small budget
+    of a resource, and only the best 1 / factor of them are carried on to
+    the next iteration, which has a budget factor times larger. This is
+    repeated until a single candidate is left or the maximum budget is
+    reached. The resource is either the number of training samples of every
+    fold, or an integer parameter of the classifier, like n_estimators or
+    max_iter. In the latter case, classifiers with a warm_start parameter
+    are fitted with warm_start set, and every fold model is kept between
+    iterations, so that it only fits the increment of the resource. As
+    warm-started classifiers count n_estimators in total but max_iter, and
+    any other resource, per call to fit, the latter are set to the
+    increment of every iteration.
+
+    Parameters
+    ----------
+    estimator_name : str
+        The name of the classifier to build with classifier_by_params for
+        every point of the grid.
+    grid : ConstrainedParameterGrid
+        The grid of parameters to search. It must not set the resource.
+    resource : str, default 'n_samples'
+        'n_samples', or the name of an integer parameter of the classifier
+        that grows its training cost, like 'n_estimators' or 'max_iter'.
+    factor : int, default 3
+        The fraction 1 / factor of candidates kept by every iteration, and
+        the growth of the budget between iterations.
+    min_resources : int, optional
+        The budget of the first iteration. By default, the one for which
+        the last iteration that leaves a single candidate uses
+        max_resources.
+    max_resources : int, optional
+        The largest budget of an iteration. By default, the size of the
+        smallest training fold for 'n_samples', and the default value of
+        the parameter otherwise.
+    cv : int, cross-validation generator or an iterable, default 5
+        Determines the cross-validation splitting strategy, as in
+        sklearn.model_selection.cross_val_score.
+    scoring : str, callable or None, optional
+        The scoring of the folds, as in cross_val_score. By default, the
+        score method of the classifier.
+    n_jobs : int, optional
+        The number of parallel jobs. None means 1 unless in a
+        :obj:`joblib.parallel_backend` context. -1 means using all
+        processors.
+    random_state : int, RandomState instance or None, optional
+        Determines the subsamples of the training folds, for the
+        'n_samples' resource. Larger subsamples contain the smaller ones.
+
+    Attributes
+    ----------
+    results_ : list of dicts
+        The results of every candidate in every iteration, in order, with
+        keys 'params', 'iter', 'n_resources', 'test_scores' and
+        'mean_test_score'.
+    best_params_ : dict
+        The parameters of the best candidate of the last iteration.
+    best_score_ : float
+        The mean test score of the best candidate of the last iteration.
+    n_candidates_ : list of int
+        The number of candidates evaluated by every iteration.
+    n_resources_ : list of int
+        The budget of every iteration.
+    n_iterations_ : int
+        The number of iterations run.
+
+    Example
+    -------
+    >>> from sklearn.datasets import make_classification
+    >>> from skutil.model_selection import ConstrainedParameterGrid
+    >>> X, y = make_classification(random_state=0)
+    >>> grid = ConstrainedParameterGrid(
+    ...     {'learning_rate': [0.01, 0.1, 1.0], 'max_depth': [1, 2, 3]},
+    ...     [{'learning_rate': [1.0], 'max_depth': [3]}],
+    ... )
+    >>> search = HalvingGridSearch(
+    ...     'gradientboosting', grid, 'n_estimators', max_resources=36, cv=3
+    ... ).fit(X, y)
+    >>> search.n_candidates_, search.n_resources_
+    ([8, 3, 1], [4, 12, 36])
+
+    """
+
+    def __init__(
+        self,
+        estimator_name,
+        grid,
+        resource="n_samples",
+        factor=3,
+        min_resources=None,
+        max_resources=None,
+        cv=5,
+        scoring=None,
+        n_jobs=None,
+        random_state=None,
+    ):
+        """Initialize the successive-halving search."""
+        self.estimator_name = estimator_name
+        self.grid = grid
+        self.resource = resource
+        self.factor = factor
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def _check_resources(self, candidates, splits, n_classes):
+        """Return the first and the largest budgets of the search."""
+        if not isinstance(self.factor, numbers.Integral) or self.factor < 2:
+            raise ValueError(
+                "factor must be an integer of at least 2, got {!r}.".format(
+                    self.factor
+                )
+            )
+        if any(self.resource in params for params in candidates):
+            raise ValueError(
+                "The resource {!r} cannot be a parameter of the grid.".format(
+                    self.resource
+                )
+            )
+        max_resources = self.max_resources
+        if max_resources is None:
+            if self.resource == "n_samples":
+                max_resources = min(len(train) for train, _ in splits)
+            else:
+                estimator = classifier_by_params(self.estimator_name)
+                max_resources = estimator.get_params().get(self.resource)
+                if not isinstance(max_resources, int):
+                    raise ValueError(
+                        "max_resources must be given for the resource {!r}, "
+                        "which has no integer default.".format(self.resource)
+                    )
+        min_resources = self.min_resources
+        if min_resources is None:
+            # enough iterations to be left with a single candidate
+            n_halvings = 0
+            while self.factor**n_halvings < len(candidates):
+                n_halvings += 1
+            min_resources = max(1, max_resources // self.factor**n_halvings)
+            if self.resource == "n_samples":
+                # a few samples of every class, as sklearn's halving search
+                min_resources = min(
+                    max(min_resources, 2 * n_classes), max_resources
+                )
+        if not 1 <= min_resources <= max_resources:
+            raise ValueError(
+                "min_resources must be between 1 and max_resources={}, got "
+                "{}.".format(max_resources, min_resources)
+            )
+        return min_resources, max_resources
+
+    def fit(self, X, y):
+        """Run successive halving over the valid points of the grid.
+
+        Parameters
+        ----------
+        X : array-like or sparse matrix, shape (n_samples, n_features)
+            The training input samples.
+        y : array-like, shape (n_samples,)
+            The target values.
+
+        Returns
+        -------
+        self : object
+            Returns self.
+
+        """
+        X, y = indexable(X, y)
+        if not hasattr(X, "iloc") and not issparse(X):
+            X = np.asarray(X)
+        y = np.asarray(y)
+        cv = check_cv(self.cv, y, classifier=True)
+        splits = list(cv.split(X, y))
+        candidates = list(self.grid)
+        if not candidates:
+            raise ValueError("The grid has no valid point to search.")
+        n_resources, max_resources = self._check_resources(
+            candidates, splits, len(np.unique(y))
+        )
+        by_samples = self.resource == "n_samples"
+        if by_samples:
+            rng = check_random_state(self.random_state)
+            # nested subsamples of every training fold
+            splits = [(rng.permutation(train), test) for train, test in splits]
+
+        estimators = [
+            [
+                classifier_by_params(self.estimator_name, **params)
+                for _ in splits
+            ]
+            for params in candidates
+        ]
+        scorer = check_scoring(estimators[0][0], scoring=self.scoring)
+        warm = not by_samples and "warm_start" in estimators[0][0].get_params()
+        if warm:
+            for params, fold_estimators in zip(candidates, estimators):
+                if "warm_start" not in params:
+                    for estimator in fold_estimators:
+                        estimator.set_params(warm_start=True)
+        # candidates warm-started on a per-call resource fit increments
+        per_call = [
+            warm
+            and self.resource not in _CUMULATIVE_RESOURCES
+            and bool(fold_estimators[0].get_params()["warm_start"])
+            for fold_estimators in estimators
+        ]
+
+        self.results_ = []
+        self.n_candidates_ = []
+        self.n_resources_ = []
+        parallel = Parallel(n_jobs=self.n_jobs)
+        index = list(range(len(candidates)))
+        fitted_resources = 0
+        while True:
+            if not by_samples:
+                for i in index:
+                    value = n_resources
+                    if per_call[i]:
+                        value -= fitted_resources
+                    for estimator in estimators[i]:
+                        estimator.set_params(**{self.resource: value})
+            fitted = parallel(
+                delayed(_fit_and_score)(
+                    estimator,
+                    X,
+                    y,
+                    train[:n_resources] if by_samples else train,
+                    test,
+                    scorer,
+                )
+                for i in index
+                for estimator, (train, test) in zip(estimators[i], splits)
+            )
+            n_splits = len(splits)
+            mean_scores = {}
+            for position, i in enumerate(index):
+                fold_results = fitted[
+                    position * n_splits : (position + 1) * n_splits
+                ]
+                # keep the fitted models, which the processes returned
+                estimators[i] = [estimator for estimator, _ in fold_results]
+                test_scores = [float(score) for _, score in fold_results]
+                mean_scores[i] = float(np.mean(test_scores))
+                self.results_.append(
+                    {
+                        "params": candidates[i],
+                        "iter": len(self.n_candidates_),
+                        "n_resources": n_resources,
+                        "test_scores": test_scores,
+                        "mean_test_score": mean_scores[i],
+                    }
+                )
+            self.n_candidates_.append(len(index))
+            self.n_resources_.append(n_resources)
+            fitted_resources = n_resources
+            index = sorted(index, key=lambda i: _order_key(mean_scores[i]))
+            if len(index) == 1 or n_resources >= max_resources:
+                break
+            index = sorted(index[: math.ceil(len(index) / self.factor)])
+            n_resources = min(n_resources * self.factor, max_resources)
+            # the models of dropped candidates are no longer needed
+            for i in set(range(len(candidates))).difference(index):
+                estimators[i] = None
+
+        self.n_iterations_ = len(self.n_candidates_)
+        self.best_params_ = candidates[index[0]]
+        self.best_score_ = mean_scores[index[0]]
+        return self
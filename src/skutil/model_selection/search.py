@@ -1,10 +1,464 @@
 """Extends scikit-learn tools for hyper-parameter search."""
 
 import copy
+from bisect import bisect_right
 from collections.abc import Sequence
+from itertools import accumulate, islice, product
+from warnings import warn
 
 import numpy as np
 from sklearn.model_selection import ParameterGrid
+from sklearn.utils import check_random_state
+from sklearn.utils.random import sample_without_replacement
+
+# numpy draws default ints, which are 32-bit on Windows before numpy 2
+_MAX_DEFAULT_INT = np.iinfo(np.int32).max
+
+
+def _same_value(value, other):
+    """Whether two values are equal and of the same type, unlike 1 and True."""
+    return type(value) is type(other) and value == other
+
+
+def _value_indices(values, selected):
+    """Return the indices of selected values in values, or None if missing.
+
+    A selected value is only matched by an equal value of the same type.
+    """
+    indices = []
+    for value in selected:
+        for i, candidate in enumerate(values):
+            if _same_value(candidate, value):
+                indices.append(i)
+                break
+        else:
+            return None
+    return indices
+
+
+def _unique_values(sub_grid):
+    """Return the sub-grid without the repeated values of each key.
+
+    Values are only repeated by equal values of the same type, so that 1,
+    1.0 and True are all kept.
+    """
+    unique_grid = {}
+    for key, values in sub_grid.items():
+        kept = [
+            value
+            for i, value in enumerate(values)
+            if not any(_same_value(value, other) for other in values[:i])
+        ]
+        unique_grid[key] = values if len(kept) == len(values) else kept
+    return unique_grid
+
+
+def _unique_sub_grid(param_grid, g):
+    """Return sub-grid g of a unique grid, and the grids of its duplicates.
+
+    These are the earlier sub-grids with the same keys, any point of which
+    is a duplicate.
+    """
+    sub_grid = _unique_values(param_grid[g])
+    return sub_grid, [
+        earlier
+        for earlier in param_grid[:g]
+        if earlier.keys() == sub_grid.keys()
+    ]
+
+
+def _mask_words(masks, n_words):
+    """Split integer bitmasks into rows of 64-bit words."""
+    words = np.empty((len(masks), n_words), dtype=np.uint64)
+    for w in range(n_words):
+        words[:, w] = np.array(
+            [mask >> (64 * w) & 0xFFFFFFFFFFFFFFFF for mask in masks],
+            dtype=np.uint64,
+        )
+    return words
+
+
+class _CompiledGrid(object):
+    """A sub-grid of a constrained grid, with its constraints compiled.
+
+    Every bad grid that can match points of the sub-grid gets a bit, and
+    every value of every key gets the bitmask of the bad grids it does not
+    rule out, i.e. those that either allow this value or do not constrain
+    its key. Enumerating the keys in order and AND-ing the masks of the
+    assigned values, a partial assignment matches a bad grid once its bit
+    is still set after the last key that bad grid constrains; the whole
+    sub-product below it can then be skipped. Values are only ever
+    compared with ==, once, at compilation.
+
+    The number of valid points below a partial assignment only depends on
+    its depth and on the bitmask of the bad grids it still matches, so
+    these counts are memoized per such state, as cumulative counts over
+    the values of the next key. They give the exact number of valid
+    points, and the point of any index by bisection down the keys.
+
+    For bulk export, points are also represented by the indices of their
+    values, and blocks of such codes are generated and filtered with
+    vectorized numpy operations, carrying the bitmasks of all rows as
+    arrays of 64-bit words.
+
+    Parameters
+    ----------
+    sub_grid : dict of string to sequence
+        The sub-grid.
+
+    bad_dicts : list of dicts of string to sequence
+        The bad grids. Those constraining keys missing from sub_grid never
+        match any of its points, and are dropped.
+
+    dupe_dicts : list of dicts of string to sequence, optional
+        More bad grids, whose values only match values of the same type,
+        ruling out the duplicates of points of other sub-grids.
+
+    """
+
+    def __init__(self, sub_grid, bad_dicts, dupe_dicts=()):
+        self.keys = sorted(sub_grid)
+        self.values = [sub_grid[key] for key in self.keys]
+        self.position = position = {
+            key: depth for depth, key in enumerate(self.keys)
+        }
+        n_bad = len(bad_dicts)
+        # a duplicate of a point is equal to it, and of the same types
+        bad_dicts = [
+            (bad_dict, j >= n_bad)
+            for j, bad_dict in enumerate(list(bad_dicts) + list(dupe_dicts))
+            if all(key in position for key in bad_dict)
+        ]
+        # a bad grid with no keys matches every point
+        self.blocked = any(not bad_dict for bad_dict, _ in bad_dicts)
+        self.full_mask = (1 << len(bad_dicts)) - 1
+        self.masks = [[0] * len(values) for values in self.values]
+        self.done = [0] * len(self.keys)
+        for j, (bad_dict, typed) in enumerate(bad_dicts):
+            bit = 1 << j
+            if bad_dict:
+                self.done[max(position[key] for key in bad_dict)] |= bit
+            for depth, key in enumerate(self.keys):
+                masks = self.masks[depth]
+                for i, value in enumerate(self.values[depth]):
+                    if key not in bad_dict or any(
+                        _same_value(value, bad_value)
+                        if typed
+                        else value == bad_value
+                        for bad_value in bad_dict[key]
+                    ):
+                        masks[i] |= bit
+        # the bad grids fully assigned once the first depth+1 keys are
+        for depth in range(1, len(self.done)):
+            self.done[depth] |= self.done[depth - 1]
+        # the bitmasks as 64-bit words, for vectorized filtering
+        self.n_words = (len(bad_dicts) + 63) // 64
+        self.mask_words = [
+            _mask_words(masks, self.n_words) for masks in self.masks
+        ]
+        self.done_words = _mask_words(self.done, self.n_words)
+        self._set_suffix_sizes()
+        self._cumulative = {}
+        self._parent = None
+        self._shared_depth = 0
+
+    def _set_suffix_sizes(self):
+        """Set the sizes of the unconstrained sub-products of every depth."""
+        self.suffix_sizes = [1] * (len(self.keys) + 1)
+        for depth in range(len(self.keys) - 1, -1, -1):
+            self.suffix_sizes[depth] = self.suffix_sizes[depth + 1] * len(
+                self.values[depth]
+            )
+
+    def restrict(self, selections):
+        """Return a view of the sub-grid restricted to some of its values.
+
+        The view shares the values, masks and memoized counts of the keys
+        deeper than all restricted ones with this sub-grid, and only holds
+        new lists for the restricted keys.
+
+        Parameters
+        ----------
+        selections : dict of int to tuple
+            Maps the depths of the restricted keys to pairs of the indices of
+            the values to keep, and of these values.
+
+        Returns
+        -------
+        _CompiledGrid
+            The restricted view.
+
+        """
+        if not selections:
+            return self
+        view = copy.copy(self)
+        view.values = list(self.values)
+        view.masks = list(self.masks)
+        view.mask_words = list(self.mask_words)
+        for depth, (indices, values) in selections.items():
+            view.values[depth] = values
+            view.masks[depth] = [self.masks[depth][i] for i in indices]
+            view.mask_words[depth] = self.mask_words[depth][indices]
+        view._set_suffix_sizes()
+        view._cumulative = {}
+        view._parent = self
+        view._shared_depth = max(selections) + 1
+        return view
+
+    def count(self, depth=0, running=None):
+        """Return the number of valid points below a partial assignment.
+
+        Parameters
+        ----------
+        depth : int, default 0
+            The number of keys assigned.
+
+        running : int, optional
+            The bitmask of the bad grids the assignment matches so far. By
+            default, all of them.
+
+        Returns
+        -------
+        int
+            The number of valid points extending the assignment.
+
+        """
+        if self.blocked:
+            return 0
+        if running is None:
+            running = self.full_mask
+        if not running:
+            return self.suffix_sizes[depth]
+        return self._cumulative_counts(depth, running)[-1]
+
+    def _cumulative_counts(self, depth, running):
+        """Return cumulative counts of valid points over the next values."""
+        if self._parent is not None and depth >= self._shared_depth:
+            return self._parent._cumulative_counts(depth, running)
+        state = (depth, running)
+        cumulative = self._cumulative.get(state)
+        if cumulative is None:
+            done = self.done[depth]
+            cumulative = list(
+                accumulate(
+                    0
+                    if running & mask & done
+                    else self.count(depth + 1, running & mask)
+                    for mask in self.masks[depth]
+                )
+            )
+            self._cumulative[state] = cumulative
+        return cumulative
+
+    def iter_slice(self, start, stop, depth=0, running=None, prefix=()):
+        """Iterate over the value tuples of a range of valid points.
+
+        Subtrees entirely outside the range are skipped by their counts, so
+        that the cost does not depend on start.
+
+        Parameters
+        ----------
+        start : int
+            The index of the first point, relative to prefix.
+
+        stop : int
+            The index after the last point, relative to prefix.
+
+        depth : int, default 0
+            The number of keys already assigned by prefix.
+
+        running : int, optional
+            The bitmask of the bad grids prefix matches so far. By default,
+            all of them.
+
+        prefix : tuple, default ()
+            The values assigned to the first depth keys.
+
+        Returns
+        -------
+        values : iterator over tuple
+            Yields the values of all keys of the valid points of indices
+            start to stop - 1, in iteration order.
+
+        """
+        if running is None:
+            running = self.full_mask
+        stop = min(stop, self.count(depth, running))
+        if start >= stop:
+            return
+        if depth == len(self.keys):
+            yield prefix
+            return
+        if not running and start == 0 and stop == self.suffix_sizes[depth]:
+            yield from self.iter_values(depth, running, prefix)
+            return
+        if running:
+            cumulative = self._cumulative_counts(depth, running)
+            first = bisect_right(cumulative, start)
+        else:
+            size = self.suffix_sizes[depth + 1]
+            cumulative = range(size, self.suffix_sizes[depth] + 1, size)
+            first = start // size
+        for i in range(first, len(cumulative)):
+            low = cumulative[i - 1] if i else 0
+            if low >= stop:
+                break
+            if cumulative[i] == low:
+                continue
+            yield from self.iter_slice(
+                max(start - low, 0),
+                stop - low,
+                depth + 1,
+                running & self.masks[depth][i],
+                prefix + (self.values[depth][i],),
+            )
+
+    def _iter_prefix_codes(self, stop_depth, depth=0, running=None, prefix=()):
+        """Iterate over the valid prefixes of a depth, and their bitmasks.
+
+        The prefixes are given as the tuples of the indices of their values.
+        """
+        if running is None:
+            running = self.full_mask
+        if depth == stop_depth:
+            yield prefix, running
+            return
+        done = self.done[depth]
+        for i, mask in enumerate(self.masks[depth]):
+            matched = running & mask
+            if not matched & done:
+                yield from self._iter_prefix_codes(
+                    stop_depth, depth + 1, matched, prefix + (i,)
+                )
+
+    def iter_codes(self, max_rows):
+        """Iterate over blocks of the codes of the valid points.
+
+        The code of a point is the tuple of the indices of its values. The
+        shortest prefixes whose sub-products fit in max_rows are enumerated
+        with pruning, and are then extended key by key in blocks, AND-ing
+        the bitmask words of the rows with those of their new values and
+        dropping the rows that match a bad grid.
+
+        Parameters
+        ----------
+        max_rows : int
+            The maximal number of rows of a block.
+
+        Returns
+        -------
+        codes : iterator over ndarray of int32, shape (n_rows, n_keys)
+            Yields blocks of codes, in iteration order.
+
+        """
+        if self.blocked:
+            return
+        n_keys = len(self.keys)
+        split = next(
+            depth
+            for depth in range(n_keys + 1)
+            if self.suffix_sizes[depth] <= max_rows
+        )
+        prefixes = self._iter_prefix_codes(split)
+        n_prefixes = max_rows // self.suffix_sizes[split]
+        while True:
+            block = list(islice(prefixes, n_prefixes))
+            if not block:
+                return
+            codes = np.array(
+                [prefix for prefix, _ in block], dtype=np.int32
+            ).reshape(len(block), split)
+            running = _mask_words(
+                [running for _, running in block], self.n_words
+            )
+            for depth in range(split, n_keys):
+                n_values = len(self.values[depth])
+                extended = np.empty(
+                    (len(codes) * n_values, depth + 1), dtype=np.int32
+                )
+                extended[:, :depth] = np.repeat(codes, n_values, axis=0)
+                extended[:, depth] = np.tile(
+                    np.arange(n_values, dtype=np.int32), len(codes)
+                )
+                if self.n_words:
+                    running = np.repeat(running, n_values, axis=0)
+                    running &= np.tile(self.mask_words[depth], (len(codes), 1))
+                    valid = ~np.any(running & self.done_words[depth], axis=1)
+                    extended, running = extended[valid], running[valid]
+                codes = extended
+            if len(codes):
+                yield codes
+
+    def point(self, index):
+        """Return the values of the valid point of the given index.
+
+        Parameters
+        ----------
+        index : int
+            The index of the point in iteration order, between 0 and
+            count() - 1.
+
+        Returns
+        -------
+        tuple
+            The values of all keys of the point.
+
+        """
+        running = self.full_mask
+        values = []
+        for depth in range(len(self.keys)):
+            if not running:
+                # mixed-radix decoding, the last key cycling fastest
+                for rest in range(depth, len(self.keys)):
+                    offset, index = divmod(index, self.suffix_sizes[rest + 1])
+                    values.append(self.values[rest][offset])
+                break
+            cumulative = self._cumulative_counts(depth, running)
+            i = bisect_right(cumulative, index)
+            if i:
+                index -= cumulative[i - 1]
+            values.append(self.values[depth][i])
+            running &= self.masks[depth][i]
+        return tuple(values)
+
+    def iter_values(self, depth=0, running=None, prefix=()):
+        """Iterate over the value tuples of the points not ruled out.
+
+        Parameters
+        ----------
+        depth : int, default 0
+            The number of keys already assigned by prefix.
+
+        running : int, optional
+            The bitmask of the bad grids prefix matches so far. By default,
+            all of them.
+
+        prefix : tuple, default ()
+            The values assigned to the first depth keys.
+
+        Returns
+        -------
+        values : iterator over tuple
+            Yields the values of all keys of the valid points extending
+            prefix, in the order of ParameterGrid.
+
+        """
+        if self.blocked:
+            return
+        if running is None:
+            running = self.full_mask
+        if not running:
+            # no bad grid can match anymore
+            for rest in product(*self.values[depth:]):
+                yield prefix + rest
+            return
+        done = self.done[depth]
+        for value, mask in zip(self.values[depth], self.masks[depth]):
+            matched = running & mask
+            if not matched & done:
+                yield from self.iter_values(
+                    depth + 1, matched, prefix + (value,)
+                )
 
 
 class ConstrainedParameterGrid(ParameterGrid):
@@ -25,6 +479,12 @@ class ConstrainedParameterGrid(ParameterGrid):
         A list of grids defining bad parameter combinations to avoid, each
         given as a dict of string to sequence. All combinations containing a
         bad combinations will be avoided.
+    unique : bool, default False
+        If True, every distinct point is yielded once, even if it belongs to
+        several sub-grids or repeats values. The points of a sub-grid that
+        also belong to an earlier sub-grid with the same keys are then
+        handled as bad combinations, so that duplicates are pruned as such,
+        without remembering the points already yielded. See n_duplicates.
 
     Example
     -------
@@ -39,16 +499,70 @@ class ConstrainedParameterGrid(ParameterGrid):
 
     """
 
-    def __init__(self, param_grid, bad_comb=None):
+    def __init__(self, param_grid, bad_comb=None, unique=False):
         """Initialize the constrained parameter grid."""
         super().__init__(param_grid)
-        self.bad_comb = bad_comb
+        bad_grids = []
         if bad_comb is not None:
-            self.bad_grids = [ParameterGrid(bad_dict) for bad_dict in bad_comb]
+            bad_grids = [ParameterGrid(bad_dict) for bad_dict in bad_comb]
+        bad_dicts = [
+            bad_dict
+            for bad_grid in bad_grids
+            for bad_dict in bad_grid.param_grid
+        ]
+        compiled = []
+        for g, sub_grid in enumerate(self.param_grid):
+            dupe_dicts = ()
+            if unique:
+                sub_grid, dupe_dicts = _unique_sub_grid(self.param_grid, g)
+            compiled.append(_CompiledGrid(sub_grid, bad_dicts, dupe_dicts))
+        self._set_compiled(
+            self.param_grid, bad_comb, unique, bad_grids, bad_dicts, compiled
+        )
+
+    def _set_compiled(
+        self, param_grid, bad_comb, unique, bad_grids, bad_dicts, compiled
+    ):
+        """Set all the attributes of the grid, from its compiled sub-grids.
+
+        This is the only place the attributes are set, for both new grids
+        and the views returned by partial.
+        """
+        self.param_grid = param_grid
+        self.bad_comb = bad_comb
+        self.unique = unique
+        self.bad_grids = bad_grids
+        self._bad_dicts = bad_dicts
+        self._compiled = compiled
+        self.code_keys = sorted(
+            {key for sub_grid in param_grid for key in sub_grid}
+        )
+        self._n_duplicates = None if unique else 0
+
+    @classmethod
+    def _from_compiled(cls, grid, param_grid, compiled):
+        """Return a grid of given compiled sub-grids, with grid's constraints.
+
+        The sub-grids are not validated, nor compiled.
+        """
+        view = cls.__new__(cls)
+        view._set_compiled(
+            param_grid,
+            grid.bad_comb,
+            grid.unique,
+            grid.bad_grids,
+            grid._bad_dicts,
+            compiled,
+        )
+        return view
 
     def __iter__(self):
         """Iterate over the points in the grid.
 
+        The points are yielded in the order of ParameterGrid, but regions
+        ruled out by a bad combination are skipped as a whole, as soon as
+        the keys that combination constrains are assigned.
+
         Returns
         -------
         params : iterator over dict of string to any
@@ -56,26 +570,235 @@ class ConstrainedParameterGrid(ParameterGrid):
             allowed values.
 
         """
-        if self.bad_comb is None:
-            for params in super().__iter__():
-                yield params
-        else:
-            bad_param_set_list = []
-            for bad_param_grid in self.bad_grids:
-                for bad_param_set in bad_param_grid:
-                    bad_param_set_list.append(bad_param_set.items())
-            for params in super().__iter__():
-                bad_found = False
-                for bad_param_set in bad_param_set_list:
-                    if bad_param_set <= params.items():
-                        bad_found = True
-                        break
-                if not bad_found:
-                    yield params
+        for compiled in self._compiled:
+            keys = compiled.keys
+            for values in compiled.iter_values():
+                yield dict(zip(keys, values))
+
+    def _iter_range(self, start, stop):
+        """Iterate over the valid points of indices start to stop - 1."""
+        for compiled in self._compiled:
+            total = compiled.count()
+            keys = compiled.keys
+            for values in compiled.iter_slice(start, stop):
+                yield dict(zip(keys, values))
+            start, stop = max(start - total, 0), stop - total
+            if stop <= 0:
+                return
+
+    def shard(self, i, n):
+        """Iterate over the i-th of n shards of the valid points.
+
+        The shards are consecutive ranges of the iteration order, whose
+        sizes differ by at most one, however unevenly the constraints
+        remove points. Each shard is enumerated directly, skipping the
+        points before it without visiting them, and the order depends only
+        on the grid and its constraints, so that n workers, possibly on
+        different machines, can each take a shard of the same grid.
+
+        Parameters
+        ----------
+        i : int
+            The index of the shard, between 0 and n - 1.
+        n : int
+            The number of shards.
+
+        Returns
+        -------
+        params : iterator over dict of string to any
+            Yields the points of the shard, in iteration order.
+
+        Example
+        -------
+        >>> param = {'a': [1, 2], 'b': [3, 4, 5]}
+        >>> grid = ConstrainedParameterGrid(param, [{'a': [1], 'b': [4]}])
+        >>> for params in grid.shard(1, 2): print(sorted(params.items()))
+        [('a', 2), ('b', 3)]
+        [('a', 2), ('b', 4)]
+        [('a', 2), ('b', 5)]
+
+        """
+        if not 0 <= i < n:
+            raise ValueError(
+                "Shard index should be in [0, %d). Got %d." % (n, i)
+            )
+        n_points = len(self)
+        return self._iter_range(i * n_points // n, (i + 1) * n_points // n)
+
+    def iter_chunks(self, chunk_size, i=0, n=1):
+        """Iterate over lists of consecutive valid points.
+
+        Parameters
+        ----------
+        chunk_size : int
+            The number of points of every chunk. The last chunk can be
+            shorter.
+        i : int, default 0
+            The index of the shard to chunk, between 0 and n - 1.
+        n : int, default 1
+            The number of shards. By default, the whole grid is chunked.
+
+        Returns
+        -------
+        chunks : iterator over list of dict of string to any
+            Yields lists of at most chunk_size points, in iteration order.
+
+        """
+        if chunk_size < 1:
+            raise ValueError(
+                "chunk_size should be positive. Got %d." % chunk_size
+            )
+        points = self.shard(i, n)
+        while True:
+            chunk = list(islice(points, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_arrays(self, chunk_size=65536):
+        """Iterate over the codes of the valid points, in blocks.
+
+        Every point is coded as a row of int32 numbers: the index of its
+        sub-grid, followed by the index of the value of every key of
+        code_keys in that sub-grid, or -1 for keys that the sub-grid does
+        not have. The blocks are generated and filtered with vectorized
+        numpy operations, without building any dictionary. Use decode to
+        get the parameters of some rows.
+
+        Parameters
+        ----------
+        chunk_size : int, default 65536
+            The maximal number of rows of a block.
+
+        Returns
+        -------
+        codes : iterator over ndarray of int32, shape (n_rows, 1 + n_keys)
+            Yields blocks of codes, in iteration order.
+
+        """
+        if chunk_size < 1:
+            raise ValueError(
+                "chunk_size should be positive. Got %d." % chunk_size
+            )
+        column = {key: 1 + k for k, key in enumerate(self.code_keys)}
+        for g, compiled in enumerate(self._compiled):
+            columns = [column[key] for key in compiled.keys]
+            for codes in compiled.iter_codes(chunk_size):
+                block = np.full(
+                    (len(codes), 1 + len(self.code_keys)), -1, dtype=np.int32
+                )
+                block[:, 0] = g
+                block[:, columns] = codes
+                yield block
+
+    def to_array(self):
+        """Return the codes of all the valid points.
+
+        Returns
+        -------
+        codes : ndarray of int32, shape (n_points, 1 + n_keys)
+            The codes of the points in iteration order, as described in
+            iter_arrays.
+
+        """
+        blocks = list(self.iter_arrays())
+        if not blocks:
+            return np.empty((0, 1 + len(self.code_keys)), dtype=np.int32)
+        return np.concatenate(blocks)
+
+    def decode(self, codes):
+        """Return the parameters of coded points.
+
+        Parameters
+        ----------
+        codes : array-like of int, shape (1 + n_keys,) or (n_rows, 1 + n_keys)
+            The code of a point, or a matrix of codes, as returned by
+            to_array and iter_arrays.
+
+        Returns
+        -------
+        params : dict of string to any, or list of such
+            The parameters of the point, or a list of those of every row.
+
+        Example
+        -------
+        >>> param = {'a': [1, 2], 'b': [3, 4, 5]}
+        >>> grid = ConstrainedParameterGrid(param, [{'a': [1], 'b': [4]}])
+        >>> codes = grid.to_array()
+        >>> codes.tolist()
+        [[0, 0, 0], [0, 0, 2], [0, 1, 0], [0, 1, 1], [0, 1, 2]]
+        >>> grid.decode(codes[1])
+        {'a': 1, 'b': 5}
+
+        """
+        codes = np.asarray(codes)
+        if codes.ndim == 2:
+            return [self.decode(row) for row in codes]
+        compiled = self._compiled[codes[0]]
+        column = {key: 1 + k for k, key in enumerate(self.code_keys)}
+        return {
+            key: values[codes[column[key]]]
+            for key, values in zip(compiled.keys, compiled.values)
+        }
+
+    @property
+    def n_duplicates(self):
+        """The number of duplicate valid points dropped by unique=True.
+
+        It is counted exactly, without enumerating the grid, on first access.
+        """
+        if self._n_duplicates is None:
+            all_points = ConstrainedParameterGrid(
+                self.param_grid, self.bad_comb
+            )
+            self._n_duplicates = len(all_points) - len(self)
+        return self._n_duplicates
+
+    def __len__(self):
+        """Return the number of valid points in the grid.
+
+        The count is exact, and is computed without enumerating the grid.
+        """
+        return sum(compiled.count() for compiled in self._compiled)
+
+    def __getitem__(self, ind):
+        """Get the parameters that would be ``ind``th in iteration.
+
+        The point is found by bisection over memoized counts of valid
+        points, without enumerating the grid.
+
+        Parameters
+        ----------
+        ind : int
+            The iteration index
+
+        Returns
+        -------
+        params : dict of string to any
+            Equal to list(self)[ind]
+
+        """
+        if ind < 0:
+            ind += len(self)
+            if ind < 0:
+                raise IndexError("ParameterGrid index out of range")
+        for compiled in self._compiled:
+            total = compiled.count()
+            if ind < total:
+                return dict(zip(compiled.keys, compiled.point(ind)))
+            ind -= total
+        raise IndexError("ParameterGrid index out of range")
 
     def partial(self, assign_grid):
         """Return a new parameter grid by the given partial assignment.
 
+        The new grid is a view of this one: it shares its value sequences
+        and compiled constraints, and only records the values of the
+        assigned keys. Assigned values that are not values of this grid, of
+        the same type, make the sub-grids they appear in compiled anew. With
+        unique=True, so are the later sub-grids with the same keys, whose
+        duplicates then change.
+
         Parameters
         ----------
         assign_grid : dict of string to object or sequence
@@ -102,17 +825,176 @@ class ConstrainedParameterGrid(ParameterGrid):
         [('a', 2), ('b', 4)]
 
         """
-        new_params = [copy.deepcopy(grid) for grid in self.param_grid]
-        for grid in new_params:
-            for key in grid:
-                if key in assign_grid:
-                    val = assign_grid[key]
-                    if not isinstance(val, (np.ndarray, Sequence)) or (
-                        isinstance(val, str)
-                    ):
-                        val = [val]
-                    grid[key] = val
-        return ConstrainedParameterGrid(
-            param_grid=new_params,
-            bad_comb=self.bad_comb,
-        )
+        assign_grid = {
+            key: val
+            if isinstance(val, (np.ndarray, Sequence))
+            and not isinstance(val, str)
+            else [val]
+            for key, val in assign_grid.items()
+        }
+        for key, val in assign_grid.items():
+            if len(val) == 0:
+                raise ValueError(
+                    "Parameter grid for parameter %r need to be a non-empty "
+                    "sequence, got: %r" % (key, val)
+                )
+        new_params = []
+        new_compiled = []
+        recompiled_keys = []
+        for g, (grid, compiled) in enumerate(
+            zip(self.param_grid, self._compiled)
+        ):
+            grid = dict(grid)
+            selections = {}
+            if self.unique and grid.keys() in recompiled_keys:
+                # its duplicates are points of a changed earlier sub-grid
+                selections = None
+            for key, val in assign_grid.items():
+                if key not in grid:
+                    continue
+                grid[key] = val
+                if self.unique:
+                    val = _unique_values({key: val})[key]
+                depth = compiled.position[key]
+                indices = _value_indices(compiled.values[depth], val)
+                if selections is not None and indices is not None:
+                    selections[depth] = (indices, val)
+                else:
+                    selections = None
+            new_params.append(grid)
+            if selections is not None:
+                new_compiled.append(compiled.restrict(selections))
+                continue
+            recompiled_keys.append(grid.keys())
+            dupe_dicts = ()
+            if self.unique:
+                grid, dupe_dicts = _unique_sub_grid(new_params, g)
+            new_compiled.append(
+                _CompiledGrid(grid, self._bad_dicts, dupe_dicts)
+            )
+        return self._from_compiled(self, new_params, new_compiled)
+
+
+def _sample_large(n_population, n_samples, rng):
+    """Yield distinct random indices of a population too large for int32.
+
+    Like the tracking selection of sample_without_replacement, but drawing
+    64-bit indices, which it cannot do on every platform.
+    """
+    selected = set()
+    while len(selected) < n_samples:
+        index = int(rng.randint(n_population, dtype=np.int64))
+        if index not in selected:
+            selected.add(index)
+            yield index
+
+
+class ConstrainedParameterSampler(object):
+    """Generator on valid parameters sampled from a constrained grid.
+
+    Points are drawn uniformly among the valid points of the grid, by
+    drawing their indices and looking them up with grid[index], so that
+    the grid is never enumerated and forbidden points are never drawn.
+    Parameters given by continuous distributions are then drawn
+    independently for every point.
+
+    Parameters
+    ----------
+    grid : ConstrainedParameterGrid
+        The constrained grid of discrete-valued parameters to sample from.
+    n_iter : int
+        Number of parameter settings that are produced.
+    param_distributions : dict of string to distribution, optional
+        Additional parameters, mapped to distributions to sample them from,
+        such as those of scipy.stats; they must provide an ``rvs`` method.
+        They may not be parameters of the grid, and so are not subject to
+        its constraints. If not given, the grid points are sampled without
+        replacement, as in sklearn's ParameterSampler. Otherwise, they are
+        sampled with replacement.
+    random_state : int, RandomState instance or None, optional
+        Pseudo random number generator state used for random uniform
+        sampling.
+
+    Example
+    -------
+    >>> param = {'a': [1, 2], 'b': [3, 4, 5]}
+    >>> grid = ConstrainedParameterGrid(param, [{'a': [1], 'b': [4]}])
+    >>> sampler = ConstrainedParameterSampler(grid, 5, random_state=0)
+    >>> sorted(sorted(params.items()) for params in sampler) == sorted(
+    ...     sorted(params.items()) for params in grid
+    ... )
+    True
+
+    """
+
+    def __init__(
+        self, grid, n_iter, param_distributions=None, random_state=None
+    ):
+        """Initialize the constrained parameter sampler."""
+        self.grid = grid
+        self.n_iter = n_iter
+        self.param_distributions = param_distributions
+        self.random_state = random_state
+
+    def _distributions(self):
+        """Validate and return the continuous parameter distributions."""
+        distributions = self.param_distributions or {}
+        for key, distribution in distributions.items():
+            if not hasattr(distribution, "rvs"):
+                raise TypeError(
+                    "Parameter distribution for parameter %r needs to "
+                    "provide an rvs method. Got %r." % (key, distribution)
+                )
+            if any(key in sub_grid for sub_grid in self.grid.param_grid):
+                raise ValueError(
+                    "Parameter %r is both in the grid and in "
+                    "param_distributions." % key
+                )
+        return distributions
+
+    def __iter__(self):
+        """Iterate over the sampled parameter settings.
+
+        Returns
+        -------
+        params : iterator over dict of string to any
+            Yields dictionaries mapping each estimator parameter to a sampled
+            value.
+
+        """
+        distributions = self._distributions()
+        rng = check_random_state(self.random_state)
+        n_points = len(self.grid)
+        if not distributions:
+            n_iter = self.n_iter
+            if n_iter > n_points:
+                warn(
+                    "The total space of valid parameters %d is smaller "
+                    "than n_iter=%d. Running %d iterations."
+                    % (n_points, self.n_iter, n_points),
+                    UserWarning,
+                    stacklevel=2,
+                )
+                n_iter = n_points
+            if n_points <= _MAX_DEFAULT_INT:
+                indices = sample_without_replacement(
+                    n_points, n_iter, random_state=rng
+                )
+            else:
+                indices = _sample_large(n_points, n_iter, rng)
+            for index in indices:
+                yield self.grid[index]
+            return
+        if not n_points:
+            raise ValueError("The grid has no valid point to sample.")
+        for _ in range(self.n_iter):
+            params = self.grid[rng.randint(n_points, dtype=np.int64)]
+            for key, distribution in distributions.items():
+                params[key] = distribution.rvs(random_state=rng)
+            yield params
+
+    def __len__(self):
+        """Return the number of points that will be sampled."""
+        if self.param_distributions:
+            return self.n_iter
+        return min(self.n_iter, len(self.grid))
@@ -0,0 +1,74 @@
+"""Test the CalibratingCvClassifier class."""
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+from skutil.calibration import CalibratingCvClassifier
+from skutil.calibration.calib_clf import _n_val
+
+
+def test_calibrating_cv_classifier():
+    X, y = make_classification(n_samples=400, n_classes=3, n_informative=4)
+    clf = CalibratingCvClassifier(
+        LogisticRegression(), method="sigmoid", batch_size=50
+    )
+    clf.fit(X, y)
+    proba = clf.predict_proba(X)
+    assert proba.shape == (400, 3)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    out = np.empty_like(proba)
+    clf.predict_proba(X, out=out)
+    np.testing.assert_allclose(out, proba)
+    assert clf.predict(X).shape == (400,)
+
+
+def test_recalibrate_partial():
+    X, y = make_classification(n_samples=400, random_state=0)
+    clf = CalibratingCvClassifier(LogisticRegression(), method="sigmoid")
+    clf.fit(X[:300], y[:300])
+    calibrator = clf._calib.calibrated_classifiers_[0].calibrators_[0]
+    n_seen = calibrator.n_neg_ + calibrator.n_pos_
+    assert clf.recalibrate_partial(X[300:], y[300:]) is clf
+    assert calibrator.n_neg_ + calibrator.n_pos_ == n_seen + 100
+    np.testing.assert_allclose(clf.predict_proba(X).sum(axis=1), 1.0)
+
+
+def test_float32():
+    X, y = make_classification(n_samples=400, random_state=0)
+    clf = CalibratingCvClassifier(
+        LogisticRegression(), method="sigmoid", dtype=np.float32
+    )
+    assert clf.fit(X, y).predict_proba(X).dtype == np.float32
+
+
+def test_max_calib_samples():
+    X, y = make_classification(n_samples=400, n_classes=3, n_informative=4)
+    clf = CalibratingCvClassifier(
+        LogisticRegression(), method="sigmoid", max_calib_samples=60
+    )
+    clf.fit(X, y)
+    calibrator = clf._calib.calibrated_classifiers_[0].calibrators_[0]
+    assert calibrator.n_neg_ + calibrator.n_pos_ == 60
+    assert clf.clf.n_features_in_ == X.shape[1]
+    np.testing.assert_allclose(clf.predict_proba(X).sum(axis=1), 1.0)
+    # a cap above the validation set size changes nothing
+    clf.set_params(max_calib_samples=1000).fit(X, y)
+    calibrator = clf._calib.calibrated_classifiers_[0].calibrators_[0]
+    assert calibrator.n_neg_ + calibrator.n_pos_ == 100
+
+
+def test_n_val():
+    X = np.zeros((101, 1))
+    for val_size in (None, 0.1, 0.25, 0.333, 1, 7, 100):
+        _, X_val = train_test_split(X, test_size=val_size)
+        assert _n_val(len(X), val_size) == len(X_val)
+    for val_size in (0, 101, 0.0, 1.0, 1.5):
+        with pytest.raises(ValueError, match="val_size"):
+            _n_val(len(X), val_size)
+    X, y = make_classification(n_samples=100)
+    clf = CalibratingCvClassifier(LogisticRegression(), max_calib_samples=0)
+    with pytest.raises(ValueError, match="max_calib_samples"):
+        clf.fit(X, y)
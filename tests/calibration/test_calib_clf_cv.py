@@ -0,0 +1,557 @@
+"""Test the UnsafeCalibratedClassifierCV class."""
+
+import pickle
+
+import numpy as np
+import pytest
+from scipy.optimize import minimize
+from scipy.sparse import csr_matrix
+from sklearn.base import clone
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression, RidgeClassifier
+from sklearn.model_selection import (
+    ShuffleSplit,
+    StratifiedKFold,
+    cross_val_predict,
+)
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import label_binarize
+from sklearn.svm import SVC, LinearSVC
+from sklearn.tree import DecisionTreeClassifier
+
+from skutil.calibration import (
+    CalibrationCurveAccumulator,
+    UnsafeCalibratedClassifierCV,
+    calib_clf_cv,
+)
+from skutil.calibration.calib_clf_cv import (
+    _batch_sigmoid_calibration,
+    _is_linear_classifier,
+    _IsotonicCalibration,
+    _LookupTableCalibration,
+    _sigmoid_calibration,
+    _SigmoidCalibration,
+    _SoftmaxCalibration,
+    calibration_curve,
+)
+
+
+def _data(n_classes=2):
+    return make_classification(
+        n_samples=300,
+        n_features=6,
+        n_informative=4,
+        n_classes=n_classes,
+        random_state=0,
+    )
+
+
+@pytest.mark.parametrize(
+    "method", ["sigmoid", "isotonic", "temperature", "vector"]
+)
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_fit_predict_proba(method, n_classes):
+    X, y = _data(n_classes)
+    clf = UnsafeCalibratedClassifierCV(method=method, cv=3)
+    clf.fit(X, y)
+    assert len(clf.calibrated_classifiers_) == 3
+    proba = clf.predict_proba(X)
+    assert proba.shape == (X.shape[0], n_classes)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    assert (clf.predict(X) == y).mean() > 0.6
+
+
+def test_parallel_folds_match_sequential():
+    X, y = _data(3)
+    base = LogisticRegression()
+    seq = UnsafeCalibratedClassifierCV(base, cv=4).fit(X, y)
+    par = UnsafeCalibratedClassifierCV(base, cv=4, n_jobs=2).fit(X, y)
+    assert len(par.calibrated_classifiers_) == 4
+    for seq_clf, par_clf in zip(
+        seq.calibrated_classifiers_, par.calibrated_classifiers_
+    ):
+        np.testing.assert_allclose(
+            seq_clf.base_estimator.coef_, par_clf.base_estimator.coef_
+        )
+    np.testing.assert_allclose(seq.predict_proba(X), par.predict_proba(X))
+
+
+def _platt_bfgs(F, y, sample_weight=None):
+    """Reference fit of Platt's objective with a generic optimizer."""
+    prior0 = float(np.sum(y <= 0))
+    prior1 = y.shape[0] - prior0
+    T = np.where(y > 0, (prior1 + 1.0) / (prior1 + 2.0), 1.0 / (prior0 + 2.0))
+    w = np.ones_like(F) if sample_weight is None else sample_weight
+
+    def objective(AB):
+        z = AB[0] * F + AB[1]
+        return np.sum(w * (np.logaddexp(0, z) - (1 - T) * z))
+
+    res = minimize(objective, [0.0, 0.0], method="BFGS", tol=1e-10)
+    return res.x
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_sigmoid_calibration_newton(weighted):
+    rng = np.random.RandomState(0)
+    F = rng.randn(2000) * 3
+    y = (rng.rand(2000) < 1 / (1 + np.exp(-0.8 * F + 0.5))).astype(int)
+    sample_weight = rng.rand(2000) if weighted else None
+    expected = _platt_bfgs(F, y, sample_weight)
+    a, b = _sigmoid_calibration(F, y, sample_weight)
+    np.testing.assert_allclose([a, b], expected, rtol=1e-5, atol=1e-6)
+    a32, b32 = _sigmoid_calibration(F, y, sample_weight, dtype=np.float32)
+    np.testing.assert_allclose([a32, b32], expected, rtol=1e-3, atol=1e-4)
+
+
+def test_sigmoid_calibration_separable():
+    F = np.array([-2.0, -1.0, 1.0, 2.0])
+    y = np.array([0, 0, 1, 1])
+    a, b = _sigmoid_calibration(F, y)
+    assert np.isfinite([a, b]).all()
+    assert a < 0
+
+
+@pytest.mark.parametrize("block_cells", [2**18, 1000])
+def test_batch_sigmoid_calibration_matches_per_column(
+    monkeypatch, block_cells
+):
+    monkeypatch.setattr(calib_clf_cv, "_SIGMOID_BLOCK_CELLS", block_cells)
+    rng = np.random.RandomState(1)
+    df = rng.randn(500, 4) * [1.0, 2.0, 0.5, 3.0]
+    Y = (rng.rand(500, 4) < 1 / (1 + np.exp(-df))).astype(int)
+    sample_weight = rng.rand(500)
+    a, b = _batch_sigmoid_calibration(df, Y, sample_weight)
+    for k in range(4):
+        a_k, b_k = _sigmoid_calibration(df[:, k], Y[:, k], sample_weight)
+        np.testing.assert_allclose([a[k], b[k]], [a_k, b_k], rtol=1e-6)
+
+
+def test_sigmoid_predict_proba_matches_calibrators():
+    X, y = _data(4)
+    clf = UnsafeCalibratedClassifierCV(method="sigmoid", cv=3).fit(X, y)
+    calibrated = clf.calibrated_classifiers_[0]
+    assert len(calibrated.calibrators_) == 4
+    df = calibrated.base_estimator.decision_function(X)
+    expected = np.column_stack(
+        [c.predict(df[:, k]) for k, c in enumerate(calibrated.calibrators_)]
+    )
+    expected /= expected.sum(axis=1)[:, np.newaxis]
+    np.testing.assert_allclose(calibrated.predict_proba(X), expected)
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_no_ensemble(n_classes):
+    X, y = _data(n_classes)
+    base = LogisticRegression()
+    clf = UnsafeCalibratedClassifierCV(base, cv=3, ensemble=False, n_jobs=2)
+    clf.fit(X, y)
+    assert len(clf.calibrated_classifiers_) == 1
+    calibrated = clf.calibrated_classifiers_[0]
+    np.testing.assert_allclose(
+        calibrated.base_estimator.coef_, clone(base).fit(X, y).coef_
+    )
+
+    oof_df = cross_val_predict(
+        base, X, y, cv=StratifiedKFold(3), method="decision_function"
+    )
+    if n_classes == 2:
+        oof_df = oof_df[:, np.newaxis]
+    Y = label_binarize(y, classes=clf.classes_)
+    a, b = _batch_sigmoid_calibration(oof_df, Y[:, : oof_df.shape[1]])
+    np.testing.assert_allclose(
+        [c.a_ for c in calibrated.calibrators_], a, rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        [c.b_ for c in calibrated.calibrators_], b, rtol=1e-6
+    )
+    proba = clf.predict_proba(X)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+
+
+def test_no_ensemble_requires_partition():
+    X, y = _data()
+    clf = UnsafeCalibratedClassifierCV(
+        cv=ShuffleSplit(3, test_size=0.2, random_state=0), ensemble=False
+    )
+    with pytest.raises(ValueError, match="partition"):
+        clf.fit(X, y)
+    # a fold missing from an iterable of splits leaves rows uncovered
+    folds = list(StratifiedKFold(3).split(X, y))[:2]
+    with pytest.raises(ValueError, match="partition"):
+        clf.set_params(cv=folds).fit(X, y)
+    with pytest.raises(ValueError, match="partition"):
+        clf.set_params(ensemble=True).fit_methods(X, y)
+
+
+@pytest.mark.parametrize("method", ["sigmoid", "isotonic"])
+@pytest.mark.parametrize("ensemble", [True, False])
+def test_batched_predict_proba(method, ensemble):
+    X, y = _data(3)
+    clf = UnsafeCalibratedClassifierCV(
+        LogisticRegression(), method=method, ensemble=ensemble
+    ).fit(X, y)
+    expected = clf.predict_proba(X)
+    clf.set_params(batch_size=7)
+    np.testing.assert_allclose(clf.predict_proba(X), expected)
+    out = np.full((X.shape[0], 3), np.nan)
+    assert clf.predict_proba(X, out=out) is out
+    np.testing.assert_allclose(out, expected)
+    np.testing.assert_array_equal(clf.predict(X), expected.argmax(axis=1))
+    with pytest.raises(ValueError, match="out should have shape"):
+        clf.predict_proba(X, out=np.empty((X.shape[0], 2)))
+
+
+@pytest.mark.parametrize("container", [csr_matrix, list])
+def test_batched_predict_proba_containers(container):
+    X, y = _data(3)
+    X_in = container(X.tolist() if container is list else X)
+    clf = UnsafeCalibratedClassifierCV(LogisticRegression(), cv=3)
+    expected = clf.fit(X, y).predict_proba(X_in)
+    clf.set_params(batch_size=7)
+    np.testing.assert_allclose(clf.predict_proba(X_in), expected)
+
+
+@pytest.mark.parametrize("method", ["sigmoid", "isotonic"])
+def test_lookup_bins(method):
+    X, y = _data(3)
+    exact = UnsafeCalibratedClassifierCV(LogisticRegression(), method=method)
+    exact.fit(X, y)
+    table = clone(exact).set_params(lookup_bins=4096).fit(X, y)
+    calibrator = table.calibrated_classifiers_[0].calibrators_[0]
+    assert isinstance(calibrator, _LookupTableCalibration)
+    assert calibrator.edges_.dtype == np.float32
+    assert calibrator.values_.shape == (4096,)
+    # the tables compile the same fitted calibrators
+    for exact_clf, table_clf in zip(
+        exact.calibrated_classifiers_, table.calibrated_classifiers_
+    ):
+        for fitted, compiled in zip(
+            exact_clf.calibrators_, table_clf.calibrators_
+        ):
+            if method == "sigmoid":
+                np.testing.assert_allclose(
+                    [compiled.calibrator.a_, compiled.calibrator.b_],
+                    [fitted.a_, fitted.b_],
+                    rtol=1e-6,
+                )
+            edges = compiled.edges_.astype(np.float64)
+            centers = (edges[:-1] + edges[1:]) / 2.0
+            np.testing.assert_allclose(
+                compiled.values_, fitted.predict(centers), atol=1e-6
+            )
+    # a sigmoid varies little over a bin, an isotonic step only at jumps
+    error = np.abs(table.predict_proba(X) - exact.predict_proba(X))
+    if method == "sigmoid":
+        assert error.max() < 5e-3
+    assert error.mean() < 1e-3
+
+
+def test_lookup_table_calibration():
+    rng = np.random.RandomState(0)
+    scores = rng.randn(1000)
+    y = (rng.rand(1000) < 1 / (1 + np.exp(-2 * scores))).astype(int)
+    sigmoid = _SigmoidCalibration().fit(scores, y)
+    table = _LookupTableCalibration(sigmoid, n_bins=2048).fit(scores)
+    np.testing.assert_allclose(
+        table.predict(scores), sigmoid.predict(scores), atol=1e-3
+    )
+    # scores out of the tabulated range get the values of the end bins
+    np.testing.assert_allclose(
+        table.predict([scores.min() - 10, scores.max() + 10]),
+        table.values_[[0, -1]],
+    )
+
+
+def _scores(n, seed=0):
+    rng = np.random.RandomState(seed)
+    scores = rng.randn(n) * 2
+    y = (rng.rand(n) < 1 / (1 + np.exp(-1.5 * scores + 0.4))).astype(int)
+    return scores, y
+
+
+def test_sigmoid_partial_fit():
+    scores, y = _scores(20000)
+    full = _SigmoidCalibration().fit(scores, y)
+    streamed = _SigmoidCalibration()
+    for batch in np.array_split(np.arange(20000), 5):
+        streamed.partial_fit(scores[batch], y[batch])
+    np.testing.assert_allclose(
+        [streamed.a_, streamed.b_], [full.a_, full.b_], rtol=1e-2
+    )
+    assert streamed.n_neg_ + streamed.n_pos_ == 20000
+
+
+def test_isotonic_partial_fit():
+    scores, y = _scores(20000)
+    full = _IsotonicCalibration().fit(scores, y)
+    streamed = _IsotonicCalibration().fit(scores[:5000], y[:5000])
+    np.testing.assert_allclose(streamed.bin_weight_.sum(), 5000)
+    streamed.partial_fit(scores[5000:], y[5000:])
+    np.testing.assert_allclose(streamed.bin_weight_.sum(), 20000)
+    np.testing.assert_allclose(
+        streamed.predict(scores), full.predict(scores), atol=0.1
+    )
+    assert (
+        np.abs(streamed.predict(scores) - full.predict(scores)).mean() < 0.02
+    )
+    # the samples of fit are not kept, only their histogram
+    fitted = _IsotonicCalibration().fit(scores[:5000], y[:5000])
+    assert all(np.shape(value) != (5000,) for value in vars(fitted).values())
+    unpickled = pickle.loads(pickle.dumps(fitted))  # noqa: S301
+    unpickled.partial_fit(scores[5000:], y[5000:])
+    np.testing.assert_array_equal(
+        unpickled.predict(scores), streamed.predict(scores)
+    )
+
+
+@pytest.mark.parametrize(
+    "method", ["sigmoid", "isotonic", "temperature", "vector"]
+)
+@pytest.mark.parametrize("lookup_bins", [None, 512])
+def test_recalibrate_partial(method, lookup_bins):
+    X, y = _data(3)
+    X_calib, y_calib = X[150:], y[150:]
+    base = LogisticRegression().fit(X[:150], y[:150])
+    params = {"method": method, "cv": "prefit", "lookup_bins": lookup_bins}
+    full = UnsafeCalibratedClassifierCV(base, **params).fit(X_calib, y_calib)
+    clf = UnsafeCalibratedClassifierCV(base, **params)
+    clf.fit(X_calib[:75], y_calib[:75])
+    clf.recalibrate_partial(X_calib[75:], y_calib[75:])
+    diff = np.abs(clf.predict_proba(X) - full.predict_proba(X))
+    assert diff.max() < 0.05
+    assert diff.mean() < 0.015
+
+
+@pytest.mark.parametrize("vector", [False, True])
+def test_softmax_calibration_recovers_scale(vector):
+    rng = np.random.RandomState(0)
+    logits = rng.randn(20000, 5)
+    scale = np.array([2.0, 2.0, 2.0, 2.0, 2.0])
+    bias = np.zeros(5)
+    if vector:
+        scale = np.array([0.5, 1.0, 2.0, 3.0, 1.5])
+        bias = np.array([0.0, 0.5, -0.5, 1.0, 0.2])
+    proba = np.exp(logits * scale + bias)
+    proba /= proba.sum(axis=1)[:, np.newaxis]
+    y = (rng.rand(20000, 1) > proba.cumsum(axis=1)).sum(axis=1)
+    Y = label_binarize(y, classes=np.arange(5))
+    calibrator = _SoftmaxCalibration(vector=vector)
+    calibrator.fit(logits, Y)
+    np.testing.assert_allclose(calibrator.coef_, scale, atol=0.15)
+    # the softmax is invariant to a shift of all biases
+    intercept = calibrator.intercept_ - calibrator.intercept_[0]
+    np.testing.assert_allclose(intercept, bias - bias[0], atol=0.15)
+
+
+def test_softmax_methods_on_predict_proba():
+    X, y = _data(3)
+    base = GaussianNB()
+    for method in ("temperature", "vector"):
+        clf = UnsafeCalibratedClassifierCV(base, method=method).fit(X, y)
+        proba = clf.predict_proba(X)
+        np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+        assert len(clf.calibrated_classifiers_[0].calibrators_) == 1
+
+
+def test_calibration_curve_accumulator_binary():
+    rng = np.random.RandomState(0)
+    y_prob = rng.rand(1000)
+    y_true = (rng.rand(1000) < y_prob).astype(int)
+    expected = calibration_curve(y_true, y_prob, n_bins=10)
+
+    left = CalibrationCurveAccumulator(n_bins=10)
+    right = CalibrationCurveAccumulator(n_bins=10)
+    for chunk in np.array_split(np.arange(1000), 7):
+        acc = left if chunk[0] < 500 else right
+        acc.update(y_true[chunk], y_prob[chunk])
+    result = left.merge(right).result()
+    np.testing.assert_allclose(result[0], expected[0])
+    np.testing.assert_allclose(result[1], expected[1])
+
+
+def test_calibration_curve_accumulator_multiclass():
+    rng = np.random.RandomState(0)
+    y_prob = rng.dirichlet([1, 1, 1], size=600)
+    labels = np.array(["a", "b", "c"])
+    y_true = labels[(rng.rand(600, 1) > y_prob.cumsum(axis=1)).sum(axis=1)]
+    acc = CalibrationCurveAccumulator(n_bins=4, classes=labels)
+    acc.update(y_true[:300], y_prob[:300]).update(y_true[300:], y_prob[300:])
+    prob_true, prob_pred = acc.result()
+    assert len(prob_true) == 3
+    for k, label in enumerate(labels):
+        expected = calibration_curve(y_true == label, y_prob[:, k], n_bins=4)
+        np.testing.assert_allclose(prob_true[k], expected[0])
+        np.testing.assert_allclose(prob_pred[k], expected[1])
+    with pytest.raises(ValueError, match="same shape"):
+        acc.update(y_true, y_prob[:, 0])
+    with pytest.raises(ValueError, match="different shapes"):
+        acc.merge(CalibrationCurveAccumulator(n_bins=3).update([1], [0.5]))
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize(
+    ("cv", "ensemble"), [(3, True), (3, False), ("prefit", True)]
+)
+def test_fit_methods_matches_fit(n_classes, cv, ensemble):
+    X, y = _data(n_classes)
+    base = LogisticRegression()
+    if cv == "prefit":
+        base.fit(X, y)
+    clf = UnsafeCalibratedClassifierCV(base, cv=cv, ensemble=ensemble)
+    calibrated = clf.fit_methods(X, y, methods=("sigmoid", "isotonic"))
+    assert sorted(calibrated) == ["isotonic", "sigmoid"]
+    # the estimator itself is left unfitted
+    assert not hasattr(clf, "classes_")
+    for method, fitted in calibrated.items():
+        assert fitted.method == method
+        expected = UnsafeCalibratedClassifierCV(
+            base, method=method, cv=cv, ensemble=ensemble
+        ).fit(X, y)
+        np.testing.assert_allclose(
+            fitted.predict_proba(X), expected.predict_proba(X)
+        )
+        scores = fitted.calibration_scores_
+        assert scores["log_loss"] > 0
+        assert 0 < scores["brier_score"] < 1
+
+
+@pytest.mark.parametrize("ensemble", [True, False])
+def test_weighted_folds(tmp_path, ensemble):
+    X, y = _data(3)
+    path = tmp_path / "X.npy"
+    np.save(path, X)
+    X_mmap = np.load(path, mmap_mode="r")
+    base = LogisticRegression(tol=1e-10)
+    expected = UnsafeCalibratedClassifierCV(base, ensemble=ensemble).fit(X, y)
+    clf = UnsafeCalibratedClassifierCV(
+        base, ensemble=ensemble, weighted_folds=True, batch_size=7
+    ).fit(X_mmap, y, sample_weight=np.ones(len(y)))
+    np.testing.assert_allclose(
+        clf.predict_proba(X), expected.predict_proba(X), atol=1e-5
+    )
+
+
+def test_weighted_folds_requires_sample_weight():
+    X, y = _data()
+    clf = UnsafeCalibratedClassifierCV(
+        KNeighborsClassifier(), weighted_folds=True
+    )
+    with pytest.raises(ValueError, match="support sample_weight"):
+        clf.fit(X, y)
+
+
+@pytest.mark.parametrize("method", ["sigmoid", "isotonic"])
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_aggregate(method, n_classes):
+    X, y = _data(n_classes)
+    # a shallow tree has a handful of distinct scores
+    base = DecisionTreeClassifier(max_depth=3, random_state=0)
+    sample_weight = np.random.RandomState(0).rand(len(y))
+    exact = UnsafeCalibratedClassifierCV(base, method=method)
+    exact.fit(X, y, sample_weight=sample_weight)
+    unique = UnsafeCalibratedClassifierCV(
+        base, method=method, aggregate="unique"
+    )
+    unique.fit(X, y, sample_weight=sample_weight)
+    assert unique.aggregation_error_ == 0.0
+    np.testing.assert_allclose(
+        unique.predict_proba(X), exact.predict_proba(X), atol=1e-6
+    )
+
+    X, y = _data(n_classes)
+    exact = UnsafeCalibratedClassifierCV(LogisticRegression(), method=method)
+    binned = clone(exact).set_params(aggregate=50)
+    exact.fit(X, y)
+    binned.fit(X, y)
+    assert binned.aggregation_error_ > 0.0
+    np.testing.assert_allclose(
+        binned.predict_proba(X), exact.predict_proba(X), atol=0.1
+    )
+
+
+@pytest.mark.parametrize("aggregate", [0, -3, "x", 2.5])
+def test_aggregate_invalid(aggregate):
+    X, y = _data()
+    clf = UnsafeCalibratedClassifierCV(
+        LogisticRegression(), aggregate=aggregate
+    )
+    with pytest.raises(ValueError, match="aggregate should be"):
+        clf.fit(X, y)
+    with pytest.raises(ValueError, match="aggregate should be"):
+        clf.fit_methods(X, y, ["sigmoid"])
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_linear_folds_single_product(monkeypatch, n_classes):
+    X, y = _data(n_classes)
+    clf = UnsafeCalibratedClassifierCV(
+        LinearSVC(random_state=0), batch_size=70
+    )
+    clf.fit(X, y)
+    n_columns = 1 if n_classes == 2 else n_classes
+    assert clf._linear_folds()[0].shape == (X.shape[1], 3 * n_columns)
+    proba = clf.predict_proba(X)
+    monkeypatch.setattr(calib_clf_cv, "_is_linear_classifier", lambda e: False)
+    expected = pickle.loads(pickle.dumps(clf))  # noqa: S301
+    assert not hasattr(expected, "_linear_folds_cache")
+    np.testing.assert_allclose(proba, expected.predict_proba(X), rtol=1e-10)
+    with pytest.raises(ValueError, match="features"):
+        clf.predict_proba(X[:, :3])
+    # float32 X keeps the precision of every fold estimator
+    X32 = X.astype(np.float32)
+    np.testing.assert_array_equal(
+        clf.predict_proba(X32), expected.predict_proba(X32)
+    )
+
+
+def test_linear_folds_feature_names():
+    pd = pytest.importorskip("pandas")
+    X, y = _data(3)
+    frame = pd.DataFrame(X, columns=list("abcdef"))
+    clf = UnsafeCalibratedClassifierCV(
+        LinearSVC(random_state=0), weighted_folds=True
+    ).fit(frame, y)
+    # the fold estimators check the feature names themselves
+    assert clf._linear_folds() is None
+    with pytest.warns(UserWarning, match="feature names"):
+        clf.predict_proba(X)
+    with pytest.raises(ValueError, match="feature names"):
+        clf.predict_proba(frame[list("bacdef")])
+
+
+def test_is_linear_classifier():
+    X, y = _data(3)
+    for estimator in (LogisticRegression(), LinearSVC(), RidgeClassifier()):
+        assert _is_linear_classifier(estimator.fit(X, y))
+    # a linear SVC has coef_, but a one-vs-one decision function
+    for estimator in (SVC(kernel="linear"), GaussianNB()):
+        assert not _is_linear_classifier(estimator.fit(X, y))
+    # an unfitted one has no coef_
+    assert not _is_linear_classifier(LinearSVC())
+
+
+@pytest.mark.parametrize(
+    "method", ["sigmoid", "isotonic", "temperature", "vector"]
+)
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_float32(method, n_classes):
+    X, y = _data(n_classes)
+    exact = UnsafeCalibratedClassifierCV(LogisticRegression(), method=method)
+    exact.fit(X, y)
+    single = clone(exact).set_params(dtype=np.float32).fit(X, y)
+    proba = single.predict_proba(X)
+    assert proba.dtype == np.float32
+    np.testing.assert_allclose(proba, exact.predict_proba(X), atol=1e-4)
+    # the precision of prediction can be changed after fitting
+    exact.set_params(dtype=np.float32)
+    assert exact.predict_proba(X).dtype == np.float32
+    with pytest.raises(ValueError, match="dtype"):
+        clone(exact).set_params(dtype=np.int32).fit(X, y)
+    # scores far beyond the float32 range of exp
+    proba = single.predict_proba(X * 30)
+    assert np.isfinite(proba).all()
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0, rtol=1e-5)
+    exact.set_params(dtype=np.float64)
+    np.testing.assert_allclose(proba, exact.predict_proba(X * 30), atol=1e-4)
@@ -0,0 +1,114 @@
+"""Test the export of calibrated classifiers."""
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+from skutil.calibration import (
+    CalibratingCvClassifier,
+    UnsafeCalibratedClassifierCV,
+    dump_calibrated,
+    load_calibrated,
+)
+
+
+def _data(n_classes):
+    X, y = make_classification(
+        n_samples=300,
+        n_features=6,
+        n_informative=4,
+        n_classes=n_classes,
+        random_state=0,
+    )
+    return X, np.array(["a", "b", "c"])[y]
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize(
+    "method", ["sigmoid", "isotonic", "temperature", "vector"]
+)
+@pytest.mark.parametrize("lookup_bins", [None, 64])
+@pytest.mark.parametrize("ensemble", [True, False])
+def test_dump_load_round_trip(
+    tmp_path, n_classes, method, lookup_bins, ensemble
+):
+    X, y = _data(n_classes)
+    clf = UnsafeCalibratedClassifierCV(
+        LogisticRegression(),
+        method=method,
+        ensemble=ensemble,
+        lookup_bins=lookup_bins,
+    ).fit(X, y)
+    dump_calibrated(clf, str(tmp_path))
+    loaded = load_calibrated(str(tmp_path))
+    assert loaded.get_params()["method"] == method
+    assert isinstance(loaded.classes_, np.memmap)
+    np.testing.assert_array_equal(loaded.classes_, clf.classes_)
+    np.testing.assert_allclose(
+        loaded.predict_proba(X), clf.predict_proba(X), rtol=1e-12
+    )
+    np.testing.assert_array_equal(loaded.predict(X), clf.predict(X))
+
+    # a loaded model exports again, but in place only if not mapped
+    dump_calibrated(loaded, str(tmp_path / "again"))
+    with pytest.raises(ValueError, match="memory-mapped"):
+        dump_calibrated(loaded, str(tmp_path))
+    in_memory = load_calibrated(str(tmp_path / "again"), mmap_mode=None)
+    dump_calibrated(in_memory, str(tmp_path / "again"))
+    again = load_calibrated(str(tmp_path / "again"))
+    assert again.get_params() == loaded.get_params()
+    np.testing.assert_array_equal(
+        again.predict_proba(X), loaded.predict_proba(X)
+    )
+
+
+def test_dump_unencodable_params(tmp_path):
+    X, y = _data(2)
+    clf = UnsafeCalibratedClassifierCV(
+        LogisticRegression(), cv=StratifiedKFold(3)
+    ).fit(X, y)
+    with pytest.warns(UserWarning, match="parameters cv of"):
+        dump_calibrated(clf, str(tmp_path))
+    loaded = load_calibrated(str(tmp_path))
+    assert loaded.cv == UnsafeCalibratedClassifierCV().cv
+    np.testing.assert_allclose(
+        loaded.predict_proba(X), clf.predict_proba(X), rtol=1e-12
+    )
+
+
+def test_dump_load_calibrating_cv_classifier(tmp_path):
+    X, y = _data(3)
+    clf = CalibratingCvClassifier(
+        LogisticRegression(), method="isotonic", val_size=0.3
+    ).fit(X, y)
+    dump_calibrated(clf, str(tmp_path))
+    loaded = load_calibrated(str(tmp_path), mmap_mode=None)
+    assert loaded.val_size == 0.3
+    np.testing.assert_allclose(
+        loaded.predict_proba(X), clf.predict_proba(X), rtol=1e-12
+    )
+
+
+def test_dump_load_float32(tmp_path):
+    X, y = _data(3)
+    clf = UnsafeCalibratedClassifierCV(
+        LogisticRegression(), dtype=np.float32
+    ).fit(X, y)
+    dump_calibrated(clf, str(tmp_path))
+    loaded = load_calibrated(str(tmp_path))
+    assert loaded.dtype is np.float32
+    proba = loaded.predict_proba(X)
+    assert proba.dtype == np.float32
+    np.testing.assert_array_equal(proba, clf.predict_proba(X))
+
+
+def test_dump_calibrated_errors(tmp_path):
+    with pytest.raises(TypeError, match="Can only export"):
+        dump_calibrated(LogisticRegression(), str(tmp_path))
+    X, y = _data(2)
+    clf = UnsafeCalibratedClassifierCV(LogisticRegression()).fit(X, y)
+    clf.classes_ = clf.classes_.astype(object)
+    with pytest.raises(ValueError, match="object dtype"):
+        dump_calibrated(clf, str(tmp_path))
@@ -0,0 +1,139 @@
+"""Test the CachedGridSearch class."""
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.metrics import accuracy_score, make_scorer
+from sklearn.model_selection import KFold, ShuffleSplit
+
+from skutil.model_selection import CachedGridSearch, ConstrainedParameterGrid
+from skutil.model_selection.cached_search import _scoring_spec
+
+PARAMS = {"C": [0.01, 0.1, 1.0], "fit_intercept": [True, False]}
+CONSTRAINTS = [{"C": [0.01], "fit_intercept": [False]}]
+
+
+def _search(tmp_path, grid, **kwargs):
+    return CachedGridSearch(
+        "lr", grid, str(tmp_path / "cache.jsonl"), cv=3, **kwargs
+    )
+
+
+def _n_lines(tmp_path):
+    with open(tmp_path / "cache.jsonl") as cache_file:
+        return len(cache_file.readlines())
+
+
+def test_cached_search(tmp_path):
+    X, y = make_classification(n_samples=200, random_state=0)
+    grid = ConstrainedParameterGrid(PARAMS, CONSTRAINTS)
+    search = _search(tmp_path, grid).fit(X, y)
+    assert search.n_evaluated_ == 5
+    assert _n_lines(tmp_path) == 5
+    assert [result["params"] for result in search.results_] == list(grid)
+    assert not any(result["cached"] for result in search.results_)
+    scores = [result["mean_test_score"] for result in search.results_]
+    assert search.best_score_ == max(scores)
+
+    # a re-run, and a partial grid, are read from the cache
+    rerun = _search(tmp_path, grid).fit(X, y)
+    assert rerun.n_evaluated_ == 0
+    assert all(result["cached"] for result in rerun.results_)
+    assert rerun.best_params_ == search.best_params_
+    assert (
+        _search(tmp_path, grid.partial({"C": 0.1})).fit(X, y).n_evaluated_ == 0
+    )
+
+    # only the new points of a widened grid are evaluated
+    wider = ConstrainedParameterGrid(dict(PARAMS, C=[0.01, 0.1, 1.0, 10.0]))
+    assert _search(tmp_path, wider, n_jobs=2).fit(X, y).n_evaluated_ == 3
+    assert _n_lines(tmp_path) == 8
+
+    # another dataset or cross-validation is another search
+    assert _search(tmp_path, grid).fit(X[:150], y[:150]).n_evaluated_ == 5
+    kfold = CachedGridSearch(
+        "lr", grid, str(tmp_path / "cache.jsonl"), cv=KFold(3)
+    )
+    assert kfold.fit(X, y).n_evaluated_ == 5
+
+
+def test_interrupted_write(tmp_path):
+    X, y = make_classification(n_samples=100, random_state=0)
+    grid = ConstrainedParameterGrid(PARAMS, CONSTRAINTS)
+    _search(tmp_path, grid).fit(X, y)
+    with open(tmp_path / "cache.jsonl") as cache_file:
+        lines = cache_file.readlines()
+    # the last result was only partly written
+    with open(tmp_path / "cache.jsonl", "w") as cache_file:
+        cache_file.writelines(lines[:-1])
+        cache_file.write(lines[-1][:20])
+    search = _search(tmp_path, grid).fit(X, y)
+    assert search.n_evaluated_ == 1
+    assert search.fit(X, y).n_evaluated_ == 0
+    with open(tmp_path / "cache.jsonl") as cache_file:
+        records = [json.loads(line) for line in cache_file.readlines()[-1:]]
+    assert np.isclose(
+        np.mean(records[0]["test_scores"]),
+        search.results_[-1]["mean_test_score"],
+    )
+
+
+def test_malformed_records(tmp_path):
+    X, y = make_classification(n_samples=100, random_state=0)
+    grid = ConstrainedParameterGrid(PARAMS, CONSTRAINTS)
+    _search(tmp_path, grid).fit(X, y)
+    with open(tmp_path / "cache.jsonl") as cache_file:
+        lines = cache_file.readlines()
+    # valid JSON, but not a record of a result
+    malformed = ['"key"', "[1, 2]", '{"params": {}}', '{"key": [1]}']
+    record = json.loads(lines[0])
+    del record["test_scores"]
+    malformed.append(json.dumps(record))
+    with open(tmp_path / "cache.jsonl", "w") as cache_file:
+        cache_file.writelines(lines[1:])
+        cache_file.writelines(line + "\n" for line in malformed)
+    search = _search(tmp_path, grid).fit(X, y)
+    assert search.n_evaluated_ == 1
+    assert search.fit(X, y).n_evaluated_ == 0
+
+
+def test_iterable_cv(tmp_path):
+    X, y = make_classification(n_samples=100, random_state=0)
+    grid = ConstrainedParameterGrid({"C": [1.0]})
+    splits = list(KFold(2).split(X))
+    search = CachedGridSearch("lr", grid, str(tmp_path / "c.jsonl"), cv=splits)
+    assert search.fit(X, y).n_evaluated_ == 1
+    assert search.fit(X, y).n_evaluated_ == 0
+    search.cv = splits[::-1]
+    assert search.fit(X, y).n_evaluated_ == 1
+    with pytest.raises(ValueError, match="at least one"):
+        CachedGridSearch("lr", grid, str(tmp_path / "c.jsonl"), cv=1).fit(X, y)
+
+
+def _accuracy(estimator, X, y):
+    return accuracy_score(y, estimator.predict(X))
+
+
+def test_stable_keys(tmp_path):
+    X, y = make_classification(n_samples=100, random_state=0)
+    grid = ConstrainedParameterGrid({"C": [0.1, 1.0]})
+    # a function is keyed by name rather than by its address
+    assert _scoring_spec(_accuracy) == __name__ + "._accuracy"
+    scorer = make_scorer(accuracy_score)
+    assert _scoring_spec(scorer) == repr(scorer)
+    search = _search(tmp_path, grid, scoring=_accuracy)
+    assert search.fit(X, y).n_evaluated_ == 2
+    assert search.fit(X, y).n_evaluated_ == 0
+    with pytest.raises(ValueError, match="no stable name"):
+        _search(tmp_path, grid, scoring=lambda e, X, y: 0.0).fit(X, y)
+
+    shuffled = CachedGridSearch(
+        "lr", grid, str(tmp_path / "cache.jsonl"), cv=ShuffleSplit(2)
+    )
+    with pytest.raises(ValueError, match="random_state"):
+        shuffled.fit(X, y)
+    shuffled.cv = ShuffleSplit(2, random_state=0)
+    assert shuffled.fit(X, y).n_evaluated_ == 2
+    assert shuffled.fit(X, y).n_evaluated_ == 0
@@ -1,5 +1,7 @@
 """Test the ConstrainedParameterGrid class."""
 
+import numpy as np
+import pytest
 from sklearn.model_selection import ParameterGrid
 
 from skutil.model_selection import ConstrainedParameterGrid
@@ -64,3 +66,291 @@ def test_partial_with_str_assignment():
         if param_set["a"] == 2:
             found_bad = True
     assert not found_bad
+
+
+def _brute_force(param_grid, bad_comb):
+    """The points of ParameterGrid matching no bad combination."""
+    bad_sets = [
+        bad_set.items()
+        for bad_dict in bad_comb
+        for bad_set in ParameterGrid(bad_dict)
+    ]
+    return [
+        params
+        for params in ParameterGrid(param_grid)
+        if not any(bad_set <= params.items() for bad_set in bad_sets)
+    ]
+
+
+PARAMS3 = [
+    {"a": [1, 2, 3], "b": ["x", "y"], "c": [0.1, 0.2, 0.3], "d": [True]},
+    {"a": [1, 2], "e": [None, "z"]},
+    {},
+    {"b": ["x"], "c": np.array([0.1, 0.5])},
+]
+
+
+@pytest.mark.parametrize(
+    "bad_comb",
+    [
+        [],
+        [{"a": [1], "c": [0.2, 0.3]}],
+        [{"a": [1, 3], "b": ["y"]}, {"c": [0.1]}, {"e": [None], "f": [1]}],
+        [{"b": ["x"], "d": [True]}, {"a": [2], "e": ["z"]}],
+        [{"a": [4]}, {"c": [0.5], "b": ["x"]}],
+        [{}],
+    ],
+)
+def test_pruned_iteration_matches_brute_force(bad_comb):
+    cgrid = ConstrainedParameterGrid(PARAMS3, bad_comb)
+    assert list(cgrid) == _brute_force(PARAMS3, bad_comb)
+
+
+@pytest.mark.parametrize(
+    "bad_comb",
+    [
+        None,
+        [{"a": [1], "c": [0.2, 0.3]}],
+        [{"a": [1, 3], "b": ["y"]}, {"c": [0.1]}, {"e": [None], "f": [1]}],
+        [{"b": ["x"], "d": [True]}, {"a": [2], "e": ["z"]}],
+        [{}],
+    ],
+)
+def test_len_and_getitem(bad_comb):
+    cgrid = ConstrainedParameterGrid(PARAMS3, bad_comb)
+    points = list(cgrid)
+    assert len(cgrid) == len(points)
+    assert [cgrid[i] for i in range(len(cgrid))] == points
+    assert [cgrid[-i] for i in range(1, len(cgrid) + 1)] == points[::-1]
+    for ind in (len(points), -len(points) - 1):
+        with pytest.raises(IndexError, match="index out of range"):
+            cgrid[ind]
+
+
+def test_negative_getitem():
+    cgrid = ConstrainedParameterGrid(
+        {"a": [1, 2, 3], "b": [1, 2]}, [{"a": [3], "b": [2]}]
+    )
+    assert cgrid[-1] == {"a": 3, "b": 1}
+    assert cgrid[-5] == {"a": 1, "b": 1}
+    with pytest.raises(IndexError, match="index out of range"):
+        cgrid[-6]
+
+
+@pytest.mark.parametrize(
+    "bad_comb",
+    [
+        None,
+        [{"a": [1], "c": [0.2, 0.3]}],
+        [{"a": [1, 3], "b": ["y"]}, {"c": [0.1]}, {"e": [None], "f": [1]}],
+        [{}],
+    ],
+)
+@pytest.mark.parametrize("n", [1, 3, 7, 40])
+def test_shard(bad_comb, n):
+    cgrid = ConstrainedParameterGrid(PARAMS3, bad_comb)
+    points = list(cgrid)
+    shards = [list(cgrid.shard(i, n)) for i in range(n)]
+    assert [params for shard in shards for params in shard] == points
+    sizes = [len(shard) for shard in shards]
+    assert max(sizes) - min(sizes) <= 1
+    chunks = list(cgrid.iter_chunks(2, n - 1, n))
+    assert [params for chunk in chunks for params in chunk] == shards[-1]
+    assert all(len(chunk) == 2 for chunk in chunks[:-1])
+
+
+def test_shard_errors():
+    cgrid = ConstrainedParameterGrid(PARAMS1, CONSTRAINTS1)
+    with pytest.raises(ValueError, match="Shard index"):
+        cgrid.shard(2, 2)
+    with pytest.raises(ValueError, match="chunk_size"):
+        next(cgrid.iter_chunks(0))
+
+
+@pytest.mark.parametrize(
+    "bad_comb",
+    [
+        None,
+        [{"a": [1], "c": [0.2, 0.3]}],
+        [{"a": [1, 3], "b": ["y"]}, {"c": [0.1]}, {"e": [None], "f": [1]}],
+        [{"b": ["x"], "d": [True]}, {"a": [2], "e": ["z"]}],
+        [{}],
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 5, 65536])
+def test_to_array(bad_comb, chunk_size):
+    cgrid = ConstrainedParameterGrid(PARAMS3, bad_comb)
+    assert cgrid.code_keys == ["a", "b", "c", "d", "e"]
+    blocks = list(cgrid.iter_arrays(chunk_size))
+    assert all(0 < len(block) <= chunk_size for block in blocks)
+    codes = cgrid.to_array()
+    assert codes.dtype == np.int32
+    assert codes.shape == (len(cgrid), 6)
+    if blocks:
+        np.testing.assert_array_equal(np.concatenate(blocks), codes)
+    assert cgrid.decode(codes) == list(cgrid)
+
+
+def test_to_array_many_constraints():
+    rng = np.random.RandomState(0)
+    params = {key: list(range(4)) for key in "abcde"}
+    bad_comb = [
+        {"abcde"[k]: [int(rng.randint(4))] for k in rng.choice(5, 3, False)}
+        for _ in range(70)
+    ]
+    cgrid = ConstrainedParameterGrid(params, bad_comb)
+    expected = _brute_force(params, bad_comb)
+    assert list(cgrid) == expected
+    assert cgrid.decode(cgrid.to_array()) == expected
+    assert len(cgrid) == len(expected)
+
+
+@pytest.mark.parametrize(
+    "assignments",
+    [
+        [{"a": 2}],
+        [{"a": [3, 1], "c": 0.2}],
+        [{"b": ["y", "x"]}, {"a": [1, 3]}, {"e": None}],
+        [{"a": 7}, {"c": 0.1}],
+        [{"d": 1}],
+        [{"f": 1}],
+    ],
+)
+def test_partial_view(assignments):
+    bad_comb = [{"a": [1, 3], "b": ["y"]}, {"c": [0.1]}, {"a": [2]}]
+    cgrid = ConstrainedParameterGrid(PARAMS3, bad_comb)
+    expected_params = PARAMS3
+    for assign_grid in assignments:
+        len(cgrid)
+        cgrid = cgrid.partial(assign_grid)
+        expected_params = [
+            {
+                key: (
+                    assign_grid[key]
+                    if isinstance(assign_grid[key], list)
+                    else [assign_grid[key]]
+                )
+                if key in assign_grid
+                else values
+                for key, values in sub_grid.items()
+            }
+            for sub_grid in expected_params
+        ]
+    expected = ConstrainedParameterGrid(expected_params, bad_comb)
+    points = list(expected)
+    assert list(cgrid) == points
+    # values are the assigned ones, not equal values of other types
+    assert [
+        [type(value) for _, value in sorted(params.items())]
+        for params in cgrid
+    ] == [
+        [type(value) for _, value in sorted(params.items())]
+        for params in points
+    ]
+    assert len(cgrid) == len(points)
+    assert [cgrid[i] for i in range(len(points))] == points
+    assert cgrid.decode(cgrid.to_array()) == points
+    # views have all the attributes of grids built by the constructor
+    assert vars(cgrid).keys() == vars(expected).keys()
+    assert cgrid.code_keys == expected.code_keys
+
+
+PARAMS4 = [
+    {"a": [1, 2, 3], "b": ["x", "y"]},
+    {"a": [3, 4, 3], "b": ["y", "z"]},
+    {"a": [1], "c": [0.1, 0.2]},
+    {"b": ["x", "z"], "a": [2, 4]},
+    {"a": [1, True, 1.0, 1], "b": ["x"]},
+    {},
+    {},
+]
+
+
+def _distinct(points):
+    """Drop repeated points, telling apart equal values of other types."""
+    seen = set()
+    distinct = []
+    for params in points:
+        key = tuple(
+            (key, type(value), value) for key, value in sorted(params.items())
+        )
+        if key not in seen:
+            seen.add(key)
+            distinct.append(params)
+    return distinct
+
+
+def _types(points):
+    return [
+        [type(value) for _, value in sorted(params.items())]
+        for params in points
+    ]
+
+
+@pytest.mark.parametrize(
+    "bad_comb", [None, [{"a": [3], "b": ["y"]}, {"b": ["z"], "a": [2]}]]
+)
+def test_unique(bad_comb):
+    cgrid = ConstrainedParameterGrid(PARAMS4, bad_comb, unique=True)
+    points = list(ConstrainedParameterGrid(PARAMS4, bad_comb))
+    expected = _distinct(points)
+    # 1, True and 1.0 are distinct values
+    assert {"a": True, "b": "x"} in expected
+    assert list(cgrid) == expected
+    assert _types(cgrid) == _types(expected)
+    assert len(cgrid) == len(expected)
+    assert cgrid.n_duplicates == len(points) - len(expected)
+    assert cgrid._n_duplicates == cgrid.n_duplicates
+    assert [cgrid[i] for i in range(len(cgrid))] == expected
+    assert cgrid.decode(cgrid.to_array()) == expected
+
+
+@pytest.mark.parametrize(
+    "assign_grid",
+    [
+        {"a": [4, 1]},
+        {"a": [4, 1, 4]},
+        {"a": [True]},
+        {"b": "y"},
+        {"a": [5, 3], "b": ["y", "x"]},
+        {"c": [0.3, 0.1]},
+    ],
+)
+def test_unique_partial(assign_grid):
+    bad_comb = [{"a": [3], "b": ["y"]}]
+    cgrid = ConstrainedParameterGrid(PARAMS4, bad_comb, unique=True)
+    partial_grid = cgrid.partial(assign_grid)
+    points = list(
+        ConstrainedParameterGrid(PARAMS4, bad_comb).partial(assign_grid)
+    )
+    expected = _distinct(points)
+    assert list(partial_grid) == expected
+    assert _types(partial_grid) == _types(expected)
+    assert len(partial_grid) == len(expected)
+    assert partial_grid.n_duplicates == len(points) - len(expected)
+    assert list(partial_grid.partial({"b": ["x", "z"]})) == _distinct(
+        list(
+            ConstrainedParameterGrid(PARAMS4, bad_comb)
+            .partial(assign_grid)
+            .partial({"b": ["x", "z"]})
+        )
+    )
+
+
+def test_unique_partial_is_view():
+    cgrid = ConstrainedParameterGrid(
+        [{"a": [1, 2, 3], "b": ["x", "y"]}, {"a": [3, 2], "b": ["y", "x"]}],
+        unique=True,
+    )
+    partial_grid = cgrid.partial({"a": [2, 3]})
+    # values of the grid restrict its compiled sub-grids, sharing them
+    assert all(
+        view._parent is compiled
+        for view, compiled in zip(partial_grid._compiled, cgrid._compiled)
+    )
+    assert list(partial_grid) == [
+        {"a": 2, "b": "x"},
+        {"a": 2, "b": "y"},
+        {"a": 3, "b": "x"},
+        {"a": 3, "b": "y"},
+    ]
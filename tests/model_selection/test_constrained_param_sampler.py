@@ -0,0 +1,80 @@
+"""Test the ConstrainedParameterSampler class."""
+
+from collections import Counter
+
+import pytest
+from scipy.stats import uniform
+
+from skutil.model_selection import (
+    ConstrainedParameterGrid,
+    ConstrainedParameterSampler,
+)
+
+PARAMS = [
+    {"a": [1, 2, 3], "b": ["x", "y", "z"]},
+    {"c": [True, False]},
+]
+CONSTRAINTS = [{"a": [1, 2], "b": ["x", "y"]}, {"c": [False]}]
+
+
+def _key(params):
+    return tuple(sorted(params.items()))
+
+
+def test_without_replacement():
+    grid = ConstrainedParameterGrid(PARAMS, CONSTRAINTS)
+    sampler = ConstrainedParameterSampler(grid, 4, random_state=0)
+    assert len(sampler) == 4
+    samples = [_key(params) for params in sampler]
+    assert len(set(samples)) == 4
+    assert set(samples) <= {_key(params) for params in grid}
+    sampler.n_iter = 10
+    with pytest.warns(UserWarning, match="smaller than n_iter"):
+        samples = [_key(params) for params in sampler]
+    assert sorted(samples) == sorted(_key(params) for params in grid)
+
+
+def test_uniform_with_distributions():
+    grid = ConstrainedParameterGrid(PARAMS, CONSTRAINTS)
+    sampler = ConstrainedParameterSampler(
+        grid, 6000, {"d": uniform(2, 1)}, random_state=0
+    )
+    counts = Counter()
+    for params in sampler:
+        assert 2 <= params.pop("d") <= 3
+        counts[_key(params)] += 1
+    assert set(counts) == {_key(params) for params in grid}
+    # 6 valid points, 1000 expected draws each
+    assert min(counts.values()) > 850
+    assert max(counts.values()) < 1150
+
+
+@pytest.mark.parametrize("distributions", [None, {"e": uniform()}])
+def test_large_grid(distributions):
+    # more points than a 32-bit int can index
+    grid = ConstrainedParameterGrid(
+        {key: list(range(300)) for key in "abcd"}, [{"a": [0]}]
+    )
+    assert len(grid) > 2**31
+    sampler = ConstrainedParameterSampler(
+        grid, 50, distributions, random_state=0
+    )
+    samples = list(sampler)
+    assert len(samples) == 50
+    keys = {_key(params) for params in samples}
+    assert len(keys) == 50
+    assert all(params["a"] != 0 for params in samples)
+    assert [_key(params) for params in sampler] == [
+        _key(params) for params in samples
+    ]
+
+
+def test_distribution_errors():
+    grid = ConstrainedParameterGrid(PARAMS, CONSTRAINTS)
+    with pytest.raises(ValueError, match="both in the grid"):
+        list(ConstrainedParameterSampler(grid, 2, {"a": uniform()}))
+    with pytest.raises(TypeError, match="rvs"):
+        list(ConstrainedParameterSampler(grid, 2, {"d": [1, 2]}))
+    empty = ConstrainedParameterGrid(PARAMS, [{}])
+    with pytest.raises(ValueError, match="no valid point"):
+        list(ConstrainedParameterSampler(empty, 2, {"d": uniform()}))
@@ -0,0 +1,117 @@
+"""Test the HalvingGridSearch class."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+from sklearn.datasets import make_classification
+from sklearn.model_selection import cross_val_score
+
+from skutil.estimators import classifier_by_params
+from skutil.model_selection import (
+    ConstrainedParameterGrid,
+    HalvingGridSearch,
+    halving_search,
+)
+
+PARAMS = {"learning_rate": [0.01, 0.1, 1.0], "max_depth": [1, 2, 3]}
+CONSTRAINTS = [{"learning_rate": [1.0], "max_depth": [3]}]
+
+
+def _key(params):
+    return tuple(sorted(params.items()))
+
+
+def test_warm_start_resource():
+    X, y = make_classification(n_samples=200, random_state=0)
+    # a seeded model, as ties between features are broken at random
+    grid = ConstrainedParameterGrid(
+        dict(PARAMS, random_state=[0]), CONSTRAINTS
+    )
+    search = HalvingGridSearch(
+        "gradientboosting", grid, "n_estimators", max_resources=36, cv=3
+    ).fit(X, y)
+    assert search.n_candidates_ == [8, 3, 1]
+    assert search.n_resources_ == [4, 12, 36]
+    assert search.n_iterations_ == 3
+    assert len(search.results_) == 12
+    valid = {_key(params) for params in grid}
+    assert {_key(result["params"]) for result in search.results_} == valid
+    # every iteration keeps the best candidates of the previous one
+    for i in (1, 2):
+        previous = [r for r in search.results_ if r["iter"] == i - 1]
+        kept = {_key(r["params"]) for r in search.results_ if r["iter"] == i}
+        previous.sort(key=lambda r: -r["mean_test_score"])
+        assert kept == {_key(r["params"]) for r in previous[: len(kept)]}
+    # the warm-started models match models fitted from scratch
+    last = search.results_[-1]
+    assert last["params"] == search.best_params_
+    estimator = classifier_by_params(
+        "gradientboosting", n_estimators=36, **search.best_params_
+    )
+    scores = cross_val_score(estimator, X, y, cv=3)
+    assert np.allclose(scores, last["test_scores"])
+    assert search.best_score_ == pytest.approx(np.mean(scores))
+
+
+def test_per_call_resource(monkeypatch):
+    # warm-started max_iter counts the epochs of a single call to fit
+    fit_and_score = halving_search._fit_and_score
+    calls = []
+
+    def record(estimator, *args):
+        calls.append(estimator.max_iter)
+        estimator, score = fit_and_score(estimator, *args)
+        assert estimator.n_iter_ == calls[-1]
+        return estimator, score
+
+    monkeypatch.setattr(halving_search, "_fit_and_score", record)
+    X, y = make_classification(n_samples=200, random_state=0)
+    grid = ConstrainedParameterGrid(
+        {"alpha": [1e-4, 1e-3, 1e-2], "tol": [None], "random_state": [0]}
+    )
+    search = HalvingGridSearch(
+        "sgd", grid, "max_iter", max_resources=12, cv=2
+    ).fit(X, y)
+    assert search.n_resources_ == [4, 12]
+    assert calls == [4] * 6 + [8] * 2
+
+
+def test_samples_resource():
+    X, y = make_classification(n_samples=300, random_state=0)
+    grid = ConstrainedParameterGrid(
+        {"C": [0.001, 0.01, 0.1, 1.0, 10.0], "fit_intercept": [True, False]},
+        [{"C": [0.001], "fit_intercept": [False]}],
+    )
+    search = HalvingGridSearch("lr", grid, cv=3, random_state=0).fit(X, y)
+    assert search.n_candidates_ == [9, 3, 1]
+    assert search.n_resources_ == [22, 66, 198]
+    assert search.best_params_ in list(grid)
+
+
+@pytest.mark.parametrize("container", [csr_matrix, pd.DataFrame, list])
+def test_input_containers(container):
+    X, y = make_classification(n_samples=150, random_state=0)
+    grid = ConstrainedParameterGrid({"C": [0.1, 1.0, 10.0]})
+    expected = HalvingGridSearch("lr", grid, cv=3, random_state=0).fit(X, y)
+    search = HalvingGridSearch("lr", grid, cv=3, random_state=0)
+    search.fit(container(X.tolist() if container is list else X), list(y))
+    assert search.results_ == expected.results_
+
+
+def test_errors():
+    X, y = make_classification(n_samples=100, random_state=0)
+    grid = ConstrainedParameterGrid({"C": [0.1, 1.0], "max_iter": [50]})
+    with pytest.raises(ValueError, match="cannot be a parameter"):
+        HalvingGridSearch("lr", grid, "max_iter").fit(X, y)
+    with pytest.raises(ValueError, match="factor"):
+        HalvingGridSearch("lr", grid, factor=1).fit(X, y)
+    with pytest.raises(ValueError, match="factor"):
+        HalvingGridSearch("lr", grid, factor=2.5).fit(X, y)
+    with pytest.raises(ValueError, match="min_resources"):
+        HalvingGridSearch("lr", grid, min_resources=1000).fit(X, y)
+    with pytest.raises(ValueError, match="no integer default"):
+        HalvingGridSearch("lr", grid, "tol").fit(X, y)
+    empty = ConstrainedParameterGrid({"C": [0.1]}, [{}])
+    with pytest.raises(ValueError, match="no valid point"):
+        HalvingGridSearch("lr", empty).fit(X, y)